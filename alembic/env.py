@@ -14,7 +14,8 @@ from app.db.base import Base
 # IMPORTANT: importez vos modèles ici quand vous les créez, ex:
 # from app.models import client, technician, intervention, event  # noqa: F401
 
-from app.models import client, technician, intervention, event, organisation
+from app.models import client, technician, intervention, event, organisation, principal
+from app.db.search import is_search_object
 
 config = context.config
 
@@ -30,6 +31,10 @@ target_metadata = Base.metadata
 def _is_sqlite(url: str) -> bool:
     return url.startswith("sqlite")
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Les index de recherche (FTS5 / GIN) sont gérés par app.db.search, pas par la metadata
+    return not (reflected and is_search_object(name))
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     kwargs = dict(
@@ -38,6 +43,7 @@ def run_migrations_offline():
         literal_binds=True,
         compare_type=True,
         render_as_batch=_is_sqlite(url),  # nécessaire pour ALTER sous SQLite
+        include_object=include_object,
     )
     context.configure(**kwargs)
     with context.begin_transaction():
@@ -52,6 +58,7 @@ def run_migrations_online():
             target_metadata=target_metadata,
             compare_type=True,
             render_as_batch=_is_sqlite(url),
+            include_object=include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
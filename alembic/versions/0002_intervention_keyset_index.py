@@ -0,0 +1,31 @@
+"""intervention keyset index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Chemin d'accès de la pagination keyset de GET /items : org_id puis (created_at, id)
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.create_index('ix_intervention_org_created_id', ['org_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.drop_index('ix_intervention_org_created_id')
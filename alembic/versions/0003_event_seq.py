@@ -0,0 +1,61 @@
+"""event per-intervention sequence
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_event_seq', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seq', sa.Integer(), nullable=True))
+
+    # Backfill : numérotation chronologique des timelines existantes
+    op.execute(
+        """
+        UPDATE events SET seq = (
+            SELECT numbered.rn FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY intervention_id ORDER BY created_at, id) AS rn
+                FROM events
+            ) AS numbered
+            WHERE numbered.id = events.id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE interventions SET last_event_seq = COALESCE(
+            (SELECT MAX(events.seq) FROM events WHERE events.intervention_id = interventions.id), 0
+        )
+        """
+    )
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('seq', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_event_intervention_seq', ['intervention_id', 'seq'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_intervention_seq')
+        batch_op.drop_column('seq')
+
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.drop_column('last_event_seq')
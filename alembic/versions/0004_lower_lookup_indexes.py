@@ -0,0 +1,35 @@
+"""case-insensitive lookup indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Index d'expression lower(col) : supportés par SQLite (>= 3.9) et Postgres
+    op.create_index('ix_clients_username_lower', 'clients', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_clients_email_lower', 'clients', [sa.text('lower(email)')], unique=False)
+    op.create_index('ix_technicians_username_lower', 'technicians', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_technicians_email_lower', 'technicians', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_technicians_email_lower', table_name='technicians')
+    op.drop_index('ix_technicians_username_lower', table_name='technicians')
+    op.drop_index('ix_clients_email_lower', table_name='clients')
+    op.drop_index('ix_clients_username_lower', table_name='clients')
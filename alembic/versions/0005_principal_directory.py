@@ -0,0 +1,57 @@
+"""principal directory
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 20:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('principals',
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('principal_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('username_lower', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organisations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role', 'principal_id')
+    )
+    with op.batch_alter_table('principals', schema=None) as batch_op:
+        batch_op.create_index('ix_principal_username_role', ['username_lower', 'role'], unique=False)
+
+    # Backfill depuis les tables existantes
+    op.execute(
+        """
+        INSERT INTO principals (role, principal_id, username, username_lower, hashed_password, deleted_at, org_id)
+        SELECT 'client', id, username, lower(username), hashed_password, deleted_at, org_id FROM clients
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO principals (role, principal_id, username, username_lower, hashed_password, deleted_at, org_id)
+        SELECT 'tech', id, username, lower(username), hashed_password, deleted_at, org_id FROM technicians
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('principals', schema=None) as batch_op:
+        batch_op.drop_index('ix_principal_username_role')
+
+    op.drop_table('principals')
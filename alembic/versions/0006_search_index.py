@@ -0,0 +1,85 @@
+"""full-text search index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+search_tables = ('clients', 'technicians')
+
+# DDL figé de cette révision (l'état courant est décrit par app.db.search)
+fts_columns = {
+    'clients': ('username', 'first_name', 'last_name', 'email'),
+    'technicians': ('username', 'name', 'email'),
+}
+tsvector_sql = {
+    'clients': "to_tsvector('simple', coalesce(clients.first_name, '') || ' ' || coalesce(clients.last_name, '') || ' ' || coalesce(clients.email, ''))",
+    'technicians': "to_tsvector('simple', coalesce(technicians.name, '') || ' ' || coalesce(technicians.email, ''))",
+}
+
+
+def sqlite_ddl(table_name: str) -> list[str]:
+    cols = fts_columns[table_name]
+    fts = f"{table_name}_fts"
+    names = ", ".join(cols)
+    new_values = ", ".join(f"new.{col}" for col in cols)
+    old_values = ", ".join(f"old.{col}" for col in cols)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table_name}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def postgres_ddl(table_name: str) -> list[str]:
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_tsv ON {table_name} USING gin ({tsvector_sql[table_name]})",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_username_trgm ON {table_name} USING gin (lower(username) gin_trgm_ops)",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name in search_tables:
+        if dialect == 'sqlite':
+            for statement in sqlite_ddl(table_name):
+                op.execute(statement)
+            # Indexation des lignes existantes
+            op.execute(f"INSERT INTO {table_name}_fts({table_name}_fts) VALUES ('rebuild')")
+        elif dialect == 'postgresql':
+            for statement in postgres_ddl(table_name):
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name in search_tables:
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table_name}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table_name}_fts")
+        elif dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_search_tsv")
+            op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_username_trgm")
@@ -0,0 +1,31 @@
+"""event org created index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Chemin d'accès de GET /events/export : organisation_id puis (created_at, id)
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_event_org_created_id', ['organisation_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_org_created_id')
@@ -0,0 +1,39 @@
+"""clients / technicians updated_at
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version des lignes (ETag) ; les lignes existantes partent de created_at
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('technicians', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE clients SET updated_at = created_at")
+    op.execute("UPDATE technicians SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # op.drop_column direct (pas de batch) : ALTER TABLE ... DROP COLUMN (SQLite >= 3.35) ne
+    # reconstruit pas la table, les index lower() de 0004 et les triggers FTS de 0006 restent en place.
+    op.drop_column('technicians', 'updated_at')
+    op.drop_column('clients', 'updated_at')
@@ -0,0 +1,88 @@
+"""org stats
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+
+    op.create_table('org_stats',
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('dimension', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organisations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('org_id', 'metric', 'dimension')
+    )
+    op.create_table('lead_times',
+    sa.Column('intervention_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('seconds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['intervention_id'], ['interventions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['org_id'], ['organisations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('intervention_id')
+    )
+    with op.batch_alter_table('lead_times', schema=None) as batch_op:
+        batch_op.create_index('ix_lead_time_org_seconds', ['org_id', 'seconds'], unique=False)
+
+    # Backfill : date de fin approchée par updated_at, puis compteurs (statuts / enums stockés par nom)
+    op.execute("UPDATE interventions SET completed_at = updated_at WHERE status = 'COMPLETED'")
+    op.execute(
+        """
+        INSERT INTO org_stats (org_id, metric, dimension, value)
+        SELECT org_id, 'status', lower(status), count(*) FROM interventions
+        WHERE deleted_at IS NULL GROUP BY org_id, status
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO org_stats (org_id, metric, dimension, value)
+        SELECT org_id, 'open', CAST(technician_id AS VARCHAR), count(*) FROM interventions
+        WHERE deleted_at IS NULL AND status IN ('PENDING', 'IN_PROGRESS') GROUP BY org_id, technician_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO org_stats (org_id, metric, dimension, value)
+        SELECT organisation_id, 'events', lower(type), count(*) FROM events GROUP BY organisation_id, type
+        """
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        seconds = "CAST((julianday(completed_at) - julianday(created_at)) * 86400 AS INTEGER)"
+    else:
+        seconds = "CAST(EXTRACT(EPOCH FROM (completed_at - created_at)) AS INTEGER)"
+    op.execute(
+        f"""
+        INSERT INTO lead_times (intervention_id, org_id, seconds)
+        SELECT id, org_id, CASE WHEN {seconds} > 0 THEN {seconds} ELSE 0 END FROM interventions
+        WHERE deleted_at IS NULL AND status = 'COMPLETED' AND completed_at IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('lead_times', schema=None) as batch_op:
+        batch_op.drop_index('ix_lead_time_org_seconds')
+
+    op.drop_table('lead_times')
+    op.drop_table('org_stats')
+    with op.batch_alter_table('interventions', schema=None) as batch_op:
+        batch_op.drop_column('completed_at')
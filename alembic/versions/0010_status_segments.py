@@ -0,0 +1,59 @@
+"""status segments
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('status_segments',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='interventionstatus', create_type=False), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('ended_at', sa.DateTime(), nullable=True),
+    sa.Column('seconds', sa.Integer(), nullable=True),
+    sa.Column('intervention_id', sa.Integer(), nullable=False),
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('technician_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['intervention_id'], ['interventions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['org_id'], ['organisations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['technician_id'], ['technicians.id'], ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('status_segments', schema=None) as batch_op:
+        batch_op.create_index('ix_status_segment_intervention', ['intervention_id', 'ended_at'], unique=False)
+        batch_op.create_index('ix_status_segment_org_ended', ['org_id', 'ended_at'], unique=False)
+
+    # Historique des statuts inconnu avant cette révision : un segment ouvert par intervention
+    # non supprimée, depuis sa création (pending) ou son dernier changement connu.
+    op.execute(
+        """
+        INSERT INTO status_segments (status, started_at, intervention_id, org_id, technician_id)
+        SELECT status, CASE WHEN status = 'PENDING' THEN created_at ELSE COALESCE(completed_at, updated_at) END,
+               id, org_id, technician_id
+        FROM interventions WHERE deleted_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('status_segments', schema=None) as batch_op:
+        batch_op.drop_index('ix_status_segment_org_ended')
+        batch_op.drop_index('ix_status_segment_intervention')
+
+    op.drop_table('status_segments')
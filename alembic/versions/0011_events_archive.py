@@ -0,0 +1,56 @@
+"""events archive
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('events_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('type', sa.Enum('STARTED', 'UPDATED', 'COMPLETED', 'DELETED', name='eventtype', create_type=False), nullable=False),
+    sa.Column('note', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('intervention_id', sa.Integer(), nullable=False),
+    sa.Column('organisation_id', sa.Integer(), nullable=False),
+    sa.Column('technician_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['intervention_id'], ['interventions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['organisation_id'], ['organisations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['technician_id'], ['technicians.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('events_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_event_archive_intervention_seq', ['intervention_id', 'seq'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les évènements archivés retournent dans la table chaude
+    op.execute(
+        """
+        INSERT INTO events (id, type, note, payload, created_at, seq, intervention_id, organisation_id, technician_id)
+        SELECT id, type, note, payload, created_at, seq, intervention_id, organisation_id, technician_id
+        FROM events_archive
+        """
+    )
+    with op.batch_alter_table('events_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_archive_intervention_seq')
+
+    op.drop_table('events_archive')
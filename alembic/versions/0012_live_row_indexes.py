@@ -0,0 +1,36 @@
+"""live row partial indexes
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+live = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # op.create_index direct (pas de batch) : aucune reconstruction de table sous SQLite,
+    # les triggers FTS de clients / technicians restent en place.
+    op.create_index('ix_clients_org_live', 'clients', ['org_id', 'id'], unique=False, sqlite_where=live, postgresql_where=live)
+    op.create_index('ix_technicians_org_live', 'technicians', ['org_id', 'id'], unique=False, sqlite_where=live, postgresql_where=live)
+    op.create_index('ix_intervention_org_created_id_live', 'interventions', ['org_id', 'created_at', 'id'], unique=False, sqlite_where=live, postgresql_where=live)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_intervention_org_created_id_live', table_name='interventions')
+    op.drop_index('ix_technicians_org_live', table_name='technicians')
+    op.drop_index('ix_clients_org_live', table_name='clients')
@@ -0,0 +1,30 @@
+"""events archive export index
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('events_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_event_archive_org_created_id', ['organisation_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_archive_org_created_id')
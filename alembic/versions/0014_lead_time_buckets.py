@@ -0,0 +1,42 @@
+"""lead time buckets
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, Sequence[str], None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Même découpage que app.db.stats.lead_bucket (figé ici pour la migration)
+buckets_per_octave = 64
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Compteurs ("lead_bucket", k) de la médiane GET /stats, recalculés depuis lead_times
+    bind = op.get_bind()
+    counts = Counter()
+    for org_id, seconds in bind.execute(sa.text("SELECT org_id, seconds FROM lead_times")):
+        counts[(org_id, str(int(math.log2(seconds + 1) * buckets_per_octave)))] += 1
+    if counts:
+        bind.execute(
+            sa.text("INSERT INTO org_stats (org_id, metric, dimension, value) VALUES (:org_id, 'lead_bucket', :dimension, :value)"),
+            [{"org_id": org_id, "dimension": dimension, "value": value} for (org_id, dimension), value in counts.items()]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM org_stats WHERE metric = 'lead_bucket'")
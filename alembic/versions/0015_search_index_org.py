@@ -0,0 +1,98 @@
+"""org-scoped full-text search index
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: Union[str, Sequence[str], None] = '0014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+search_tables = ('clients', 'technicians')
+
+# DDL figé des deux états : colonnes indexées avec org_id (cette révision) et sans (0006)
+fts_columns = {
+    'clients': ('org_id', 'username', 'first_name', 'last_name', 'email'),
+    'technicians': ('org_id', 'username', 'name', 'email'),
+}
+previous_columns = {
+    'clients': ('username', 'first_name', 'last_name', 'email'),
+    'technicians': ('username', 'name', 'email'),
+}
+tsvector_sql = {
+    'clients': "to_tsvector('simple', coalesce(clients.first_name, '') || ' ' || coalesce(clients.last_name, '') || ' ' || coalesce(clients.email, ''))",
+    'technicians': "to_tsvector('simple', coalesce(technicians.name, '') || ' ' || coalesce(technicians.email, ''))",
+}
+
+
+def _sqlite_ddl(table_name: str, cols: tuple[str, ...]) -> list[str]:
+    fts = f"{table_name}_fts"
+    names = ", ".join(cols)
+    new_values = ", ".join(f"new.{col}" for col in cols)
+    old_values = ", ".join(f"old.{col}" for col in cols)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table_name}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        # Indexation des lignes existantes
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _drop_sqlite(table_name: str) -> None:
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {table_name}_fts_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {table_name}_fts")
+
+
+def _drop_postgres(table_name: str) -> None:
+    op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_search_tsv")
+    op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_username_trgm")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name in search_tables:
+        if dialect == 'sqlite':
+            # La liste des colonnes d'une table FTS5 est figée : on la recrée puis on réindexe
+            _drop_sqlite(table_name)
+            for statement in _sqlite_ddl(table_name, fts_columns[table_name]):
+                op.execute(statement)
+            # org_id ne sert qu'au filtrage : poids nul dans bm25
+            weights = ', '.join(['0'] + ['1'] * (len(fts_columns[table_name]) - 1))
+            op.execute(f"INSERT INTO {table_name}_fts({table_name}_fts, rank) VALUES ('rank', 'bm25({weights})')")
+        elif dialect == 'postgresql':
+            _drop_postgres(table_name)
+            op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+            op.execute(f"CREATE INDEX ix_{table_name}_search_tsv ON {table_name} USING gin (org_id, {tsvector_sql[table_name]})")
+            op.execute(f"CREATE INDEX ix_{table_name}_username_trgm ON {table_name} USING gin (org_id, lower(username) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name in search_tables:
+        if dialect == 'sqlite':
+            _drop_sqlite(table_name)
+            for statement in _sqlite_ddl(table_name, previous_columns[table_name]):
+                op.execute(statement)
+        elif dialect == 'postgresql':
+            _drop_postgres(table_name)
+            op.execute(f"CREATE INDEX ix_{table_name}_search_tsv ON {table_name} USING gin ({tsvector_sql[table_name]})")
+            op.execute(f"CREATE INDEX ix_{table_name}_username_trgm ON {table_name} USING gin (lower(username) gin_trgm_ops)")
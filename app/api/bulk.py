@@ -0,0 +1,53 @@
+# Outils communs des imports en masse (POST /clients/bulk, POST /technicians/bulk).
+# - Contrôles d'unicité ensemblistes : un SELECT ... IN (...) par colonne et par tranche.
+# - Insertion par tranches (executemany + RETURNING), une transaction par tranche.
+# - L'insert Core contourne les évènements ORM : l'annuaire principals est alimenté ici.
+
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Sequence
+
+from app.models.principal import Principal, principal_values
+from app.schemas.bulk import BulkRowResult, BulkResult
+
+max_rows = 10000
+chunk_size = 1000
+
+def chunks(items: Sequence, size: int = chunk_size) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def existing_values(db: Session, column, values: Iterable[str], *filters) -> set[str]:
+    """Valeurs de `values` déjà présentes en base pour l'expression `column`."""
+    values = list({value for value in values if value is not None})
+    found: set[str] = set()
+    for part in chunks(values):
+        found.update(db.execute(select(column).filter(column.in_(part), *filters)).scalars())
+    return found
+
+def insert_rows(db: Session, model, role: str, rows: list[tuple[int, dict]], results: list[BulkRowResult | None]) -> None:
+    """Insère les lignes validées (index dans le lot, valeurs) et complète `results`."""
+    table = model.__table__
+    for part in chunks(rows):
+        try:
+            ids = db.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                [values for _, values in part]
+            ).scalars().all()
+            db.execute(insert(Principal.__table__), [
+                principal_values(role, SimpleNamespace(id=row_id, deleted_at=None, **values))
+                for row_id, (_, values) in zip(ids, part)
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            for index, _ in part:
+                results[index] = BulkRowResult(index=index, status="rejected", detail="Erreur serveur imprévue lors de l'insertion de la tranche.")
+            continue
+        for row_id, (index, _) in zip(ids, part):
+            results[index] = BulkRowResult(index=index, status="created", id=row_id)
+
+def bulk_result(results: list[BulkRowResult]) -> BulkResult:
+    created = sum(1 for result in results if result.status == "created")
+    return BulkResult(created=created, rejected=len(results) - created, results=results)
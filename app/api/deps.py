@@ -1,20 +1,55 @@
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Literal
+from dataclasses import dataclass
+from datetime import datetime
 
+from app.core.config import settings
+from app.core.cache import TTLCache, ResponseCache
+from app.core.pubsub import EventBroker
 from app.core.security import decode_access_token
-from app.models.client import Client
-from app.models.technician import Technician
+from app.models.principal import Principal
 
 # Point d'extension pour la DB (session SQLAlchemy), à brancher quand vous implémentez.
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+@dataclass(frozen=True)
+class CurrentUser:
+    """Utilisateur authentifié (client ou technicien), détaché de toute session DB."""
+    id: int
+    username: str
+    org_id: int
+    role: str
+    deleted_at: datetime | None = None
+
+# Principals résolus, clé (role, username en minuscules, org_id du token)
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(role: str, username: str) -> None:
+    """À appeler après toute modification/suppression d'un client ou technicien."""
+    username = username.lower()
+    principal_cache.invalidate(lambda key: key[0] == role and key[1] == username)
+
+# Réponses des lectures chaudes, clé (org_id, route, paramètres normalisés).
+# Propre au processus : le TTL borne l'obsolescence vis-à-vis des autres workers et des scripts.
+response_cache = ResponseCache(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+def invalidate_responses(*tags) -> None:
+    """À appeler après une écriture : étiquettes ("client", id), ("tech", id), ("item", id),
+    ("events", intervention_id) ou ("technicians", org_id) pour les listes de techniciens.
+    """
+    response_cache.invalidate_tags(*tags)
+
+# Nouveaux évènements de timeline -> flux SSE ouverts sur ce processus (voir events.stream_events)
+event_broker = EventBroker(queue_size=settings.SSE_QUEUE_SIZE)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> CurrentUser:
     try:
         payload = decode_access_token(token)
         username = payload.get("sub")
@@ -23,13 +58,16 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 
         if username is None or org_id is None:
             raise HTTPException(status_code=401, detail="Token invalide")
-        
-        if role == "client":
-            query = select(Client).filter(func.lower(Client.username) == username.lower())
-        elif role == "tech":
-            query = select(Technician).filter(func.lower(Technician.username) == username.lower())
-        else:
+
+        cache_key = (role, username.lower(), org_id)
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if role not in ("client", "tech"):
             raise HTTPException(status_code=403, detail="Rôle inconnu.")
+        # Lecture ponctuelle dans l'annuaire (ix_principal_username_role)
+        query = select(Principal).filter(Principal.username_lower == username.lower(), Principal.role == role)
     except JWTError:
         raise HTTPException(status_code=401, detail="Token invalide ou expiré")
 
@@ -37,10 +75,14 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not result:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé.")
     
-    # attacher org_id du token
-    result.org_id = org_id 
-    result.role = role
-    return result
+    # org_id du token
+    current_user = CurrentUser(id=result.principal_id, username=result.username, org_id=org_id, role=role, deleted_at=result.deleted_at)
+    principal_cache.set(cache_key, current_user)
+    return current_user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    """Équivalent de get_current_user pour les routes async (AsyncSession)."""
+    return await db.run_sync(lambda session: get_current_user(token=token, db=session))
 
 def get_org_id(x_org_id: str | None = Header(default=None, alias="X-Org-ID")) -> str:
     """Header obligatoire pour toutes les routes (hors /health).
@@ -58,5 +100,23 @@ def get_role(expected_role: Literal["client", "tech"] = "client"):
                 detail=f"Accès interdit, rôle requis : {expected_role}"
             )
         return user
+    role_checker.expected_role = expected_role
     return role_checker
 
+def get_role_async(expected_role: Literal["client", "tech"] = "client"):
+    async def role_checker(user = Depends(get_current_user_async)):
+        if user.role != expected_role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Accès interdit, rôle requis : {expected_role}"
+            )
+        return user
+    return role_checker
+
+def sync_only(endpoint):
+    """Marque une route qui reste sync (threadpool) même quand les routes async sont actives :
+    travail CPU bloquant (bcrypt) ou réponse streamée qui survit à la session async.
+    """
+    endpoint.sync_only = True
+    return endpoint
+
@@ -0,0 +1,70 @@
+"""Versions async (AsyncSession) des routers clients, technicians, items, events et stats.
+
+Chaque route sync est réexposée en `async def` sur la même URL : ses dépendances
+get_db / get_current_user / get_role sont remplacées par leurs équivalents async et
+le handler existant est exécuté via AsyncSession.run_sync. Les I/O passent par le
+driver async (aiosqlite / psycopg) sans thread du threadpool, et la logique métier
+reste unique. Les routes marquées @sync_only sont reprises telles quelles.
+
+Activées par ASYNC_DB=true (voir app.main).
+"""
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_async_db, get_current_user, get_current_user_async, get_role_async
+from app.api.routers import clients, technicians, interventions, events, timeline, stats
+
+def _async_dependency(dependency):
+    if dependency is get_db:
+        return get_async_db
+    if dependency is get_current_user:
+        return get_current_user_async
+    expected_role = getattr(dependency, "expected_role", None)
+    if expected_role is not None:
+        return get_role_async(expected_role)
+    return dependency
+
+def asyncify(endpoint):
+    """Construit l'équivalent async d'un handler sync prenant un paramètre `db`."""
+    signature = inspect.signature(endpoint)
+    parameters = []
+    for param in signature.parameters.values():
+        if isinstance(param.default, DependsParam):
+            dependency = _async_dependency(param.default.dependency)
+            annotation = AsyncSession if dependency is get_async_db else param.annotation
+            param = param.replace(default=Depends(dependency), annotation=annotation)
+        parameters.append(param)
+
+    async def async_endpoint(**kwargs):
+        db: AsyncSession = kwargs.pop("db")
+        return await db.run_sync(lambda session: endpoint(db=session, **kwargs))
+
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__doc__ = endpoint.__doc__
+    return async_endpoint
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    async_router = APIRouter()
+    for route in router.routes:
+        endpoint = route.endpoint
+        if not getattr(endpoint, "sync_only", False):
+            endpoint = asyncify(endpoint)
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            status_code=route.status_code,
+            response_model=route.response_model,
+            response_class=route.response_class,
+            responses=route.responses,
+            tags=route.tags,
+            name=route.name,
+            include_in_schema=route.include_in_schema,
+        )
+    return async_router
+
+routers = [asyncify_router(module.router) for module in (clients, technicians, interventions, events, timeline, stats)]
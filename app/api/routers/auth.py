@@ -1,28 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.models.client import Client
-from app.models.technician import Technician
+from app.models.principal import Principal
 from app.db.session import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"], include_in_schema=False)
 
-@router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    result = db.execute(select(Client).filter(func.lower(Client.username) == form_data.username.lower()))
-    user = result.scalars().first()
-    role = "client"
-
-    if not user :
+def _find_user(db: Session, username: str):
+    """Lecture unique dans l'annuaire (requête sync, à exécuter hors event loop).
+    À username égal, le client reste prioritaire sur le technicien ("client" < "tech").
+    La session est fermée ensuite : la connexion retourne au pool avant le hachage bcrypt.
+    """
+    try:
         user = db.execute(
-            select(Technician).filter(func.lower(Technician.username) == form_data.username.lower())
+            select(Principal)
+            .filter(Principal.username_lower == username.lower())
+            .order_by(Principal.role)
+            .limit(1)
         ).scalars().first()
-        role = "tech"
+        return user, user.role if user else None
+    finally:
+        db.close()
+
+@router.post("/login")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user, role = await run_in_threadpool(_find_user, db, form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Identifiants invalides.")
 
     if user.deleted_at is not None:
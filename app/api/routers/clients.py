@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from typing import Annotated, List
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, or_
 from datetime import datetime, timezone
 
-from app.api.deps import get_db, get_current_user, get_role
+from app.api.deps import get_db, get_current_user, get_role, invalidate_principal, sync_only, response_cache, invalidate_responses
 from app.models.client import Client
 from app.models.organisation import Organisation
 from app.schemas.client import PaginatedClient, ClientOut, CreateClient, PatchClient
-from app.core.security import hash_password
+from app.core.security import hash_password, hash_passwords
+from app.db.search import search_hits
+from app.core.pagination import fetch_page, row_dicts, CountMode
+from app.core.etag import weak_etag, etag_matches, not_modified, conditional
+from app.api.bulk import max_rows, existing_values, insert_rows, bulk_result
+from app.schemas.bulk import BulkRowResult, BulkResult
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
 default_limit = 50
 max_limit = 200
 
+# Colonnes projetées sous les noms de ClientOut (liste : une seule validation par page)
+client_columns = (
+    Client.id, Client.first_name, Client.last_name, Client.username, Client.email, Client.phone,
+    Organisation.name.label("organisation"), Client.created_at, Client.deleted_at,
+)
+
 @router.post("", status_code=status.HTTP_201_CREATED)
+@sync_only  # bcrypt : reste sur le threadpool
 def create_client(
     new_user: CreateClient,
     current_user: Client = Depends(get_current_user),
@@ -37,7 +50,7 @@ def create_client(
     if db_user:
         raise HTTPException(status_code=400, detail="Cette adresse email est déjà inscrite. Veuillez choisir une autre adresse.")
     
-    check_query = query.filter(func.lower(Client.phone) == new_user.phone)
+    check_query = query.filter(Client.phone == new_user.phone)
     db_user = db.execute(check_query).scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="Ce numéro de téléphone est déjà inscrit. Veuillez choisir un autre numéro.")
@@ -57,17 +70,68 @@ def create_client(
         )
     return {"message": f"Nouveau client '{new_user.username}' créé avec succès."}
 
+@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=BulkResult)
+@sync_only  # bcrypt : reste sur le threadpool
+def create_clients_bulk(
+    new_users: List[CreateClient],
+    current_user: Client = Depends(get_current_user),
+    current_role = Depends(get_role("tech")),
+    db: Session = Depends(get_db)
+):
+    """Import en masse de clients (org courante), avec un résultat par ligne.
+    Les lignes en conflit (avec la base ou plus haut dans le lot) sont rejetées, les autres insérées.
+    """
+
+    if len(new_users) > max_rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Un import est limité à {max_rows} clients.")
+
+    # username / email / phone sont uniques sur toute la table
+    usernames = existing_values(db, func.lower(Client.username), (user.username.lower() for user in new_users))
+    emails = existing_values(db, func.lower(Client.email), (user.email.lower() for user in new_users))
+    phones = existing_values(db, Client.phone, (user.phone for user in new_users))
+
+    results: list[BulkRowResult | None] = [None] * len(new_users)
+    accepted = []
+    for index, new_user in enumerate(new_users):
+        username, email = new_user.username.lower(), new_user.email.lower()
+        if username in usernames:
+            detail = "Cet username est déjà inscrit. Veuillez choisir un autre username."
+        elif email in emails:
+            detail = "Cette adresse email est déjà inscrite. Veuillez choisir une autre adresse."
+        elif new_user.phone is not None and new_user.phone in phones:
+            detail = "Ce numéro de téléphone est déjà inscrit. Veuillez choisir un autre numéro."
+        else:
+            detail = None
+        if detail:
+            results[index] = BulkRowResult(index=index, status="rejected", detail=detail)
+            continue
+        usernames.add(username)
+        emails.add(email)
+        phones.add(new_user.phone)
+        accepted.append((index, new_user))
+
+    hashed_passwords = hash_passwords([new_user.password for _, new_user in accepted])
+    rows = [
+        (index, {"first_name": new_user.first_name, "last_name": new_user.last_name, "username": new_user.username, "hashed_password": hashed_password, "email": new_user.email, "phone": new_user.phone, "org_id": current_user.org_id})
+        for (index, new_user), hashed_password in zip(accepted, hashed_passwords)
+    ]
+    insert_rows(db, Client, "client", rows, results)
+    return bulk_result(results)
+
 @router.get("", status_code=status.HTTP_200_OK, response_model=PaginatedClient)
 def list_clients(
     q: str | None = None,
     limit: int = default_limit,
     offset: int = 0,
+    count: CountMode = "exact",
+    include_deleted: bool = False,
     current_user: Client = Depends(get_current_user),
     current_role = Depends(get_role("tech")),
     db: Session = Depends(get_db)
 ):
     """Lister clients de l'org (pagination & filtre q).
-    TODO: requête SQL (limit/offset), recherche q (au choix: name/email), retour liste (+ total si voulu).
+    count : exact (défaut, count(*) OVER ()), estimated (planner / cache) ou none (has_more seul).
+    include_deleted : inclure les clients supprimés (par défaut, index partiel ix_clients_org_live).
     """
 
     if limit < 1 or limit > max_limit:
@@ -76,55 +140,65 @@ def list_clients(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Offset ne peut pas être négatif.")
     
     query = (
-    select(Client, Organisation.name.label("org_name"))
+    select(*client_columns)
     .join(Organisation, Client.org_id == Organisation.id)
     .filter(Client.org_id == current_user.org_id)   
     )
+    if not include_deleted:
+        query = query.filter(Client.deleted_at.is_(None))
 
-    # Filtre
-    if q:
-        search = f"%{q.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Client.first_name).like(search),
-                func.lower(Client.last_name).like(search),
-                func.lower(Client.email).like(search)
-            )
-        )
-    # Total number of results before offset or limit
-    total = db.execute(select(func.count()).select_from(query.subquery())).scalar()
-    query = query.limit(limit).offset(offset)
-
+    # Filtre : index plein texte (préfixes, trié par pertinence), voir app.db.search
+    hits = search_hits(db, "clients", current_user.org_id, q) if q else None
+    if hits is not None:
+        hits = hits.subquery()
+        query = query.join(hits, hits.c.id == Client.id).order_by(hits.c.rank, Client.id)
     try:
-        rows = db.execute(query).all()
+        page = fetch_page(db, query, limit, offset, count)
     except Exception:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur serveur imprévue.")
     
+    rows = page.rows
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Aucun client trouvé pour votre organisation.")
     
-    clients = [
-        ClientOut(id=row.Client.id, first_name=row.Client.first_name, last_name=row.Client.last_name, username=row.Client.username, email=row.Client.email, phone=row.Client.phone, organisation=row.org_name, created_at=row.Client.created_at, deleted_at=row.Client.deleted_at)
-        for row in rows
-    ]
-    return PaginatedClient(
-        total_result=total,
-        limit=limit,
-        offset=offset,
-        clients=clients
-    )
+    return PaginatedClient.model_validate({
+        "total_result": page.total,
+        "has_more": page.has_more,
+        "limit": limit,
+        "offset": offset,
+        "clients": row_dicts(rows)
+    })
 
 @router.get("/{client_id}", status_code=status.HTTP_200_OK, response_model=ClientOut)
 def get_client(
     client_id: int, 
+    if_none_match: Annotated[str | None, Header()] = None,
+    response: Response = None,
     current_user: Client = Depends(get_current_user),
     current_role = Depends(get_role("tech")),
     db: Session = Depends(get_db)
     ):
     """Récupérer un client (filtré org).
-    TODO: SELECT + 404 si introuvable/hors org.
+    ETag faible dérivé de updated_at : If-None-Match identique -> 304, vérifié par une
+    lecture de la seule version avant la requête complète. Réponse mise en cache (response_cache).
     """
-    
+
+    cache_key = (current_user.org_id, "get_client", client_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return conditional(*cached, if_none_match, response)
+    # Capturée avant la lecture en base (voir ResponseCache.generation)
+    generation = response_cache.generation()
+
+    version = db.execute(
+        select(Client.updated_at).filter(Client.org_id == current_user.org_id, Client.id == client_id)
+    ).first()
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Client avec id {client_id} introuvable dans votre organisation.")
+    etag = weak_etag("client", client_id, version.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     query = (
     select(Client, Organisation.name.label("org_name"))
     .join(Organisation, Client.org_id == Organisation.id)
@@ -146,6 +220,9 @@ def get_client(
         created_at=row.Client.created_at,
         deleted_at=row.Client.deleted_at
     )
+    response_cache.set(cache_key, (etag, client), tags=[("client", client_id)], generation=generation)
+    if response is not None:
+        response.headers["ETag"] = etag
     return client
 
 @router.patch("/{client_id}", status_code=status.HTTP_200_OK, response_model=ClientOut)
@@ -197,36 +274,28 @@ def update_client(
         if exists:
             raise HTTPException(status_code=409, detail="Ce numéro de téléphone est déjà utilisé. Veuillez choisir un autre numéro.")
 
+    previous_username = client.username
     for field, value in patch_data.model_dump(exclude_unset=True).items():
         setattr(client, field, value)
 
     try:
         db.commit()
-        db.refresh(client)
     except Exception:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur serveur imprévue lors de la mise à jour du client."
         )
+    invalidate_principal("client", previous_username)
+    invalidate_responses(("client", client_id))
 
+    # Réponse : un seul SELECT joint, sans refresh de l'entité expirée par le commit
     row = db.execute(
-        select(Client, Organisation.name.label("org_name"))
+        select(*client_columns)
         .join(Organisation, Client.org_id == Organisation.id)
-        .filter(Client.id == client.id)
+        .filter(Client.id == client_id)
     ).first()
-
-    return ClientOut(
-        id=row.Client.id,
-        first_name=row.Client.first_name,
-        last_name=row.Client.last_name,
-        username=row.Client.username,
-        email=row.Client.email,
-        phone=row.Client.phone,
-        organisation=row.org_name,
-        created_at=row.Client.created_at,
-        deleted_at=row.Client.deleted_at
-    )
+    return ClientOut.model_validate(dict(zip(row._fields, row)))
 
 @router.delete("/{client_id}", status_code=status.HTTP_200_OK)
 def delete_client(
@@ -265,5 +334,7 @@ def delete_client(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur serveur imprévue lors de la suppression du client."
         )
+    invalidate_principal("client", client.username)
+    invalidate_responses(("client", client.id))
 
     return {"message" : "Client supprimé avec succès."}
@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, union_all, null
 from datetime import datetime, timezone
-from typing import List
+from typing import Annotated, List
+from collections import Counter
+import asyncio
 
-from app.api.deps import get_org_id, get_current_user, get_db, get_role
+from app.api.deps import get_org_id, get_current_user, get_db, get_role, sync_only, response_cache, invalidate_responses, event_broker
+from app.core.config import settings
+from app.db.stats import bump
 from app.models.client import Client
 from app.models.organisation import Organisation
 from app.models.technician import Technician
-from app.models.event import Event
+from app.models.event import Event, ArchivedEvent
 from app.models.intervention import Intervention
 from app.schemas.event import CreateEvent, EventOut
+from app.core.etag import weak_etag, etag_matches, not_modified, conditional
 
 router = APIRouter(prefix="/interventions/{intervention_id}/events", tags=["events"])
 
+max_limit = 200
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_event(
     new_event: CreateEvent,
@@ -72,6 +81,7 @@ def create_event(
 
     try:
         db.add(event)
+        bump(db, current_user.org_id, Counter({("events", event.type.value): 1}))
         db.commit()
         db.refresh(event)
     except Exception as e:
@@ -80,41 +90,209 @@ def create_event(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur serveur imprévue lors de la création d'évènement. {e}"
         )
+    invalidate_responses(("events", intervention_id))
+
+    # Diffusion aux flux SSE ouverts (lecture du nom d'org seulement s'il y a des abonnés)
+    if event_broker.has_subscribers(current_user.org_id, intervention_id):
+        organisation = db.execute(select(Organisation.name).filter(Organisation.id == current_user.org_id)).scalar()
+        event_broker.publish(current_user.org_id, intervention_id, EventOut(
+            id=event.id, seq=event.seq, type=event.type, note=event.note, payload=event.payload, created_at=event.created_at,
+            intervention_id=event.intervention_id, organisation=organisation, technician_id=event.technician_id
+        ))
     
     return {"message": f"Nouvelle intervention id : {event.id} créée avec succès."}
 
 @router.get("", status_code=status.HTTP_200_OK, response_model=List[EventOut])
 def list_events(
     intervention_id: int,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    include_archived: bool = False,
+    include_payload: bool = True,
+    if_none_match: Annotated[str | None, Header()] = None,
+    response: Response = None,
     current_user: Client = Depends(get_current_user),
     db: Session = Depends(get_db)
     ):
     """Lister la timeline d'un intervention (ordre chronologique).
-    TODO: SELECT events par intervention_id/org, ORDER BY date ASC.
+    Polling incrémental : `since_seq` ne renvoie que les évènements de seq strictement
+    supérieure (lecture servie par ix_event_intervention_seq), `limit` borne la page.
+    ETag faible dérivé de Intervention.last_event_seq (et des paramètres) : pas de nouvel
+    évènement -> 304 sans relire la timeline. Réponse mise en cache (response_cache)
+    jusqu'au prochain évènement de l'intervention.
+    `include_archived` : ajoute les évènements déplacés dans events_archive (interventions
+    clôturées, voir scripts/archive_events.py) ; par défaut seule la table chaude est lue.
+    `include_payload=false` : squelette de la timeline, payload à null sans lire la colonne.
     """
+
+    if limit is not None and (limit < 1 or limit > max_limit):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Limit doit être entre 1 et {max_limit}.")
+    if since_seq is not None and since_seq < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since_seq ne peut pas être négatif.")
     
+    cache_key = (current_user.org_id, "list_events", intervention_id, since_seq, limit, include_archived, include_payload)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return conditional(*cached, if_none_match, response)
+    # Capturée avant la lecture en base (voir ResponseCache.generation)
+    generation = response_cache.generation()
+
     intervention = db.execute(
-        select(Intervention)
+        select(Intervention.last_event_seq)
         .filter(
             Intervention.id == intervention_id,
             Intervention.org_id == current_user.org_id
         )
-    ).scalars().first()
+    ).first()
 
     if not intervention:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Intervention introuvable dans votre organisation."
         )
+    etag = weak_etag("events", intervention_id, intervention.last_event_seq, since_seq, limit, include_archived, include_payload)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
+    query = _timeline_query(intervention_id, since_seq, include_archived, include_payload)
+    if limit is not None:
+        query = query.limit(limit)
+    events = db.execute(query).all()
+    response_cache.set(cache_key, (etag, events), tags=[("events", intervention_id)], generation=generation)
+    if response is not None:
+        response.headers["ETag"] = etag
+    return events
+
+def _timeline_select(source, intervention_id: int, since_seq: int | None, include_payload: bool = True):
+    payload = source.payload if include_payload else null().label("payload")
     query = (
-    db.query(Event.id, Event.type, Event.note, Event.payload,
-             Event.created_at, Event.intervention_id,
-             Organisation.name.label("organisation"),
-             Event.technician_id)
-            .join(Organisation, Organisation.id == Event.organisation_id)
-            .filter(Event.intervention_id == intervention_id)
-            .order_by(Event.created_at.asc())
+        select(source.id, source.seq, source.type, source.note, payload,
+               source.created_at, source.intervention_id,
+               Organisation.name.label("organisation"),
+               source.technician_id)
+        .join(Organisation, Organisation.id == source.organisation_id)
+        .filter(source.intervention_id == intervention_id)
+    )
+    if since_seq is not None:
+        query = query.filter(source.seq > since_seq)
+    return query
+
+def _timeline_query(intervention_id: int, since_seq: int | None = None, include_archived: bool = False, include_payload: bool = True):
+    """Timeline par seq croissante ; avec include_archived, union avec events_archive
+    (seq unique par intervention sur les deux tables, chacune lue par son index (intervention_id, seq)).
+    """
+    if not include_archived:
+        return _timeline_select(Event, intervention_id, since_seq, include_payload).order_by(Event.seq.asc())
+    timeline = union_all(
+        _timeline_select(Event, intervention_id, since_seq, include_payload),
+        _timeline_select(ArchivedEvent, intervention_id, since_seq, include_payload),
+    ).subquery()
+    return select(timeline).order_by(timeline.c.seq.asc())
+
+def _stream_start(db: Session, org_id: int, intervention_id: int) -> int:
+    """last_event_seq de l'intervention (404 hors org), puis libère la connexion."""
+    try:
+        intervention = db.execute(
+            select(Intervention.last_event_seq).filter(Intervention.id == intervention_id, Intervention.org_id == org_id)
+        ).first()
+    finally:
+        db.rollback()
+    if not intervention:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Intervention introuvable dans votre organisation.")
+    return intervention.last_event_seq
+
+def _events_after(db: Session, intervention_id: int, after_seq: int) -> list[EventOut]:
+    """Au plus max_limit évènements de seq > after_seq. Le flux peut durer des heures :
+    rollback après chaque lecture pour rendre la connexion au pool.
+    Les seq d'une intervention sont contiguës : si la table chaude ne commence pas à
+    after_seq + 1, la suite est (en partie) archivée et on relit aussi events_archive.
+    """
+    try:
+        rows = db.execute(_timeline_query(intervention_id, after_seq).limit(max_limit)).all()
+        if not rows or rows[0].seq > after_seq + 1:
+            rows = db.execute(_timeline_query(intervention_id, after_seq, include_archived=True).limit(max_limit)).all()
+    finally:
+        db.rollback()
+    return [EventOut.model_validate(dict(zip(row._fields, row))) for row in rows]
+
+def _sse_frame(event: EventOut) -> str:
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+@router.get("/stream", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+@sync_only  # flux long sur la boucle asyncio ; lectures via la session sync dans le threadpool
+async def stream_events(
+    intervention_id: int,
+    since_seq: int | None = None,
+    last_event_id: Annotated[str | None, Header()] = None,
+    current_user: Client = Depends(get_current_user),
+    db: Session = Depends(get_db)
+    ):
+    """Suivre la timeline d'un intervention en direct (Server-Sent Events).
+    Chaque évènement est poussé dès que create_event le commit (`id:` = seq, `event:` = type,
+    `data:` = EventOut). Reprise : le header Last-Event-ID (ou `since_seq`) rejoue depuis la base
+    les évènements manqués ; sans l'un ni l'autre, seuls les nouveaux évènements sont envoyés.
+    Commentaire `: heartbeat` toutes les SSE_HEARTBEAT_SECONDS pour garder la connexion ouverte.
+    Diffusion propre au processus : un trou de seq (évènement écrit par un autre worker) ou une
+    file saturée déclenche une relecture de la base.
+    """
+
+    if last_event_id is not None:
+        try:
+            since_seq = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Last-Event-ID invalide.")
+    if since_seq is not None and since_seq < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since_seq ne peut pas être négatif.")
+
+    org_id = current_user.org_id
+    # Abonnement avant la lecture de la base : aucun évènement ne tombe entre les deux
+    subscription = event_broker.subscribe(org_id, intervention_id)
+    try:
+        last_seq = await run_in_threadpool(_stream_start, db, org_id, intervention_id)
+    except BaseException:
+        event_broker.unsubscribe(org_id, subscription)
+        raise
+    if since_seq is not None:
+        last_seq = min(since_seq, last_seq)
+
+    async def replay(after_seq: int):
+        while True:
+            events = await run_in_threadpool(_events_after, db, intervention_id, after_seq)
+            for event in events:
+                yield event
+            if len(events) < max_limit:
+                return
+            after_seq = events[-1].seq
+
+    async def frames():
+        nonlocal last_seq
+        try:
+            async for event in replay(last_seq):
+                last_seq = event.seq
+                yield _sse_frame(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if subscription.lagging or event.seq > last_seq + 1:
+                    subscription.lagging = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    async for event in replay(last_seq):
+                        last_seq = event.seq
+                        yield _sse_frame(event)
+                    continue
+                if event.seq <= last_seq:
+                    continue
+                last_seq = event.seq
+                yield _sse_frame(event)
+        finally:
+            event_broker.unsubscribe(org_id, subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    events = query.all()
-    return events
\ No newline at end of file
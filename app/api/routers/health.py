@@ -1,8 +1,21 @@
 from fastapi import APIRouter
 
+from app.api.deps import principal_cache, response_cache, event_broker
+from app.core.pagination import count_cache
+
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health():
     """Ping simple, doit répondre immédiatement."""
     return {"status": "ok"}
+
+@router.get("/health/cache")
+def cache_stats():
+    """Compteurs des caches en mémoire du processus (hits/misses, taille)."""
+    return {"principals": principal_cache.stats(), "counts": count_cache.stats(), "responses": response_cache.stats()}
+
+@router.get("/health/streams")
+def stream_stats():
+    """Abonnés SSE de ce processus et messages publiés / abandonnés (files pleines)."""
+    return event_broker.stats()
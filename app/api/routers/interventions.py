@@ -1,19 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
-from datetime import datetime, timezone
+from sqlalchemy import select, update, func, or_, tuple_
+from datetime import datetime, timezone, timedelta
+from typing import Annotated, Literal
+from collections import Counter
+import csv
+import io
 
-from app.api.deps import get_current_user, get_role, get_db
+from app.api.deps import get_current_user, get_role, get_db, sync_only, response_cache, invalidate_responses
 from app.models.intervention import Intervention
 from app.models.client import Client
 from app.models.technician import Technician
 from app.models.organisation import Organisation
-from app.schemas.intervention import CreateItem, PaginatedItem, ItemOut, PatchItem, InterventionStatus
+from app.schemas.intervention import CreateItem, PaginatedItem, ItemOut, PatchItem, InterventionStatus, BulkPatchItem, BulkPatchResult, BulkItemRejection, ItemAnalytics
+from app.core.pagination import encode_cursor, decode_cursor, fetch_page, row_dicts, CountMode
+from app.db.search import search_hits
+from app.core.etag import weak_etag, etag_matches, not_modified, conditional
+from app.api.bulk import max_rows, chunks
+from app.db.stats import item_deltas, transition_deltas, bump, record_lead_times, clear_lead_times, open_segments, close_segments, change_segments, status_durations
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 default_limit = 50
 max_limit = 200
+export_batch_size = 1000
+analytics_default_days = 30
+
+# Transitions de statut autorisées ; l'annulation reste possible depuis n'importe quel statut
+valid_transitions = {
+    InterventionStatus.PENDING: [InterventionStatus.IN_PROGRESS, InterventionStatus.CANCELLED],
+    InterventionStatus.IN_PROGRESS: [InterventionStatus.COMPLETED, InterventionStatus.CANCELLED],
+    InterventionStatus.COMPLETED: [InterventionStatus.CANCELLED],
+    InterventionStatus.CANCELLED: []
+}
+
+def allowed_sources(new_status: InterventionStatus) -> list[InterventionStatus]:
+    """Statuts depuis lesquels on peut passer à new_status."""
+    if new_status == InterventionStatus.CANCELLED:
+        return list(InterventionStatus)
+    return [source for source, targets in valid_transitions.items() if new_status in targets]
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_item(
@@ -38,16 +64,25 @@ def create_item(
     if not technician:
         raise HTTPException(status_code=404, detail="Technicien assigné introuvable dans votre organisation.")
     
+    now = datetime.now(timezone.utc)
     item = Intervention(
         client_id=client.id,
         org_id=current_user.org_id,
         technician_id=technician.id,
         description=new_item.description,
-        status=new_item.status
+        status=new_item.status,
+        created_at=now,
+        completed_at=now if new_item.status == InterventionStatus.COMPLETED else None
     )
 
     try:
         db.add(item)
+        db.flush()
+        # Statistiques de l'org dans la même transaction (voir app.db.stats)
+        bump(db, current_user.org_id, item_deltas(item.status, item.technician_id))
+        if item.status == InterventionStatus.COMPLETED:
+            record_lead_times(db, current_user.org_id, [item], now)
+        open_segments(db, current_user.org_id, [item], item.status, now)
         db.commit()
         db.refresh(item)
     except Exception as e:
@@ -59,6 +94,53 @@ def create_item(
     
     return {"message": f"Nouvelle intervention id : {item.id} créée avec succès."}
 
+# Colonnes projetées sous les noms de ItemOut : pas d'hydratation ORM, une seule validation par page
+item_columns = (
+    Intervention.id,
+    Intervention.status,
+    Intervention.description,
+    Client.username.label("client_username"),
+    Technician.username.label("technicien_username"),
+    Organisation.name.label("organisation"),
+    Intervention.created_at,
+    Intervention.updated_at,
+    Intervention.deleted_at,
+)
+
+def _items_query(db: Session, org_id: int, status_eq: str | None, client_id: int | None, q: str | None, include_deleted: bool = False):
+    """Requête items de l'org avec les filtres de GET /items (partagée par la liste et l'export).
+    Sans include_deleted, seules les interventions vivantes (index partiel ix_intervention_org_created_id_live).
+    """
+    query = (
+    select(*item_columns)
+    .join(Organisation, Intervention.org_id == Organisation.id)
+    .join(Client, Intervention.client_id == Client.id)
+    .join(Technician, Intervention.technician_id == Technician.id)
+    .filter(Intervention.org_id == org_id)
+    )
+    if not include_deleted:
+        query = query.filter(Intervention.deleted_at.is_(None))
+
+    # Filtre : username client ou technicien via l'index plein texte (préfixes)
+    client_hits = search_hits(db, "clients", org_id, q, field="username") if q else None
+    if client_hits is not None:
+        tech_hits = search_hits(db, "technicians", org_id, q, field="username")
+        query = query.filter(
+            or_(
+                Intervention.client_id.in_(select(client_hits.subquery().c.id)),
+                Intervention.technician_id.in_(select(tech_hits.subquery().c.id))
+            )
+        )
+
+    if status_eq:
+        search = f"%{status_eq.lower()}%"
+        query = query.filter(func.lower(Intervention.status).like(search))
+
+    if client_id:
+        query = query.filter(Intervention.client_id == client_id)
+
+    return query
+
 @router.get("", status_code=status.HTTP_200_OK, response_model=PaginatedItem)
 def list_items(
     status_eq: str | None = None,
@@ -66,12 +148,20 @@ def list_items(
     q: str | None = None,
     limit: int = default_limit,
     offset: int = 0,
+    count: CountMode = "exact",
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = None,
+    include_deleted: bool = False,
     current_role = Depends(get_role("tech")),
     current_user: Client = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Lister items (org).
-    TODO: filtres (status, client_id, q - username client/technicien), pagination.
+    Deux modes de pagination :
+    - offset (défaut) : limit/offset + total_result selon `count` (exact, estimated, none).
+    - cursor : keyset sur (created_at, id) décroissant, sans COUNT ; passer `cursor`
+      avec le `next_cursor` de la page précédente (implique pagination=cursor).
+    include_deleted : inclure les interventions supprimées (exclues par défaut).
     """
     
     if limit < 1 or limit > max_limit:
@@ -79,96 +169,297 @@ def list_items(
     if offset < 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Offset ne peut pas être négatif.")
     
-    query = (
-    select(
-        Intervention,
-        Organisation.name.label("org_name"),
-        Client.username.label("client_username"),
-        Technician.username.label("technician_username")
-    )
-    .join(Organisation, Intervention.org_id == Organisation.id)
-    .join(Client, Intervention.client_id == Client.id)
-    .join(Technician, Intervention.technician_id == Technician.id)
-    .filter(Intervention.org_id == current_user.org_id)
-    )
+    query = _items_query(db, current_user.org_id, status_eq, client_id, q, include_deleted)
 
-    # Filtre
-    if q:
-        search = f"%{q.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Technician.username).like(search),
-                func.lower(Client.username).like(search)               
-            )
-        )
+    if cursor or pagination == "cursor":
+        return _list_items_keyset(db, query, limit, cursor)
 
-    if status_eq:
-        search = f"%{status_eq.lower()}%"
-        query = query.filter(func.lower(Intervention.status).like(search))
+    try:
+        page = fetch_page(db, query, limit, offset, count)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur serveur imprévue.")
+    
+    rows = page.rows
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Aucune intervention trouvée pour votre organisation.")
+    
+    return PaginatedItem.model_validate({
+        "total_result": page.total,
+        "has_more": page.has_more,
+        "limit": limit,
+        "offset": offset,
+        "interventions": row_dicts(rows)
+    })
 
-    if client_id:
-        query = query.filter(Intervention.client_id == client_id)
+def _item_row(db: Session, org_id: int, item_id: int):
+    """Une ligne ItemOut (+ client_id / technician_id) en un seul SELECT joint, sans charger d'entités."""
+    return db.execute(
+        select(*item_columns, Intervention.client_id, Intervention.technician_id)
+        .join(Organisation, Intervention.org_id == Organisation.id)
+        .join(Client, Intervention.client_id == Client.id)
+        .join(Technician, Intervention.technician_id == Technician.id)
+        .filter(Intervention.org_id == org_id, Intervention.id == item_id)
+    ).first()
 
-    total = db.execute(select(func.count()).select_from(query.subquery())).scalar()
-    query = query.limit(limit).offset(offset)
+def _item_out(row) -> ItemOut:
+    return ItemOut.model_validate(dict(zip(row._fields, row)))
+
+def _list_items_keyset(db: Session, query, limit: int, cursor: str | None) -> PaginatedItem:
+    """Page keyset : seek sur (created_at, id) servi par ix_intervention_org_created_id.
+    Latence constante quelle que soit la profondeur, pas de COUNT(*).
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Intervention.created_at, Intervention.id) < tuple_(cursor_created_at, cursor_id))
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    query = query.order_by(Intervention.created_at.desc(), Intervention.id.desc()).limit(limit + 1)
 
     try:
         rows = db.execute(query).all()
     except Exception:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur serveur imprévue.")
-    
-    if not rows:
+
+    if not rows and not cursor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Aucune intervention trouvée pour votre organisation.")
-    
-    items = [
-        ItemOut(
-            id=row.Intervention.id, status=row.Intervention.status, description=row.Intervention.description,
-            client_username=row.client_username, technicien_username=row.technician_username, organisation=row.org_name, created_at=row.Intervention.created_at, updated_at=row.Intervention.updated_at, deleted_at=row.Intervention.deleted_at
-        ) for row in rows
-    ]
-    return PaginatedItem(
-        total_result=total,
-        limit=limit,
-        offset=offset,
-        interventions=items
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return PaginatedItem.model_validate({
+        "total_result": None,
+        "has_more": next_cursor is not None,
+        "limit": limit,
+        "offset": 0,
+        "next_cursor": next_cursor,
+        "interventions": row_dicts(rows)
+    })
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+@sync_only  # générateur : lit la session sync pendant le streaming
+def export_items(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status_eq: str | None = None,
+    client_id: int | None = None,
+    q: str | None = None,
+    include_deleted: bool = False,
+    current_role = Depends(get_role("tech")),
+    current_user: Client = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Exporter tous les items de l'org (mêmes filtres que GET /items), en NDJSON ou CSV.
+    Lecture par curseur serveur (yield_per) : mémoire constante, premier octet dès le premier lot.
+    """
+
+    query = (
+        _items_query(db, current_user.org_id, status_eq, client_id, q, include_deleted)
+        .order_by(Intervention.created_at.desc(), Intervention.id.desc())
+        .execution_options(yield_per=export_batch_size)
     )
 
+    def ndjson_lines():
+        for rows in db.execute(query).partitions():
+            yield "".join(_item_out(row).model_dump_json() + "\n" for row in rows)
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ItemOut.model_fields)
+        for rows in db.execute(query).partitions():
+            for row in rows:
+                writer.writerow(_item_out(row).model_dump(mode="json").values())
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    if format == "csv":
+        content, media_type = csv_lines(), "text/csv"
+    else:
+        content, media_type = ndjson_lines(), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="interventions.{format}"'}
+    )
+
+def _track_transition(db: Session, org_id: int, intervention: Intervention, previous_status: InterventionStatus) -> None:
+    """Statistiques de l'org (app.db.stats) pour un changement de statut, dans la transaction en cours."""
+    now = datetime.now(timezone.utc)
+    bump(db, org_id, transition_deltas(previous_status, intervention.status, intervention.technician_id))
+    change_segments(db, org_id, [intervention], intervention.status, now)
+    if intervention.status == InterventionStatus.COMPLETED:
+        intervention.completed_at = now
+        record_lead_times(db, org_id, [intervention], now)
+    elif previous_status == InterventionStatus.COMPLETED:
+        clear_lead_times(db, org_id, [intervention.id])
+
+@router.patch("/bulk", status_code=status.HTTP_200_OK, response_model=BulkPatchResult)
+def update_items_bulk(
+    patch_data: BulkPatchItem,
+    db: Session = Depends(get_db),
+    current_user: Client = Depends(get_current_user),
+    current_role = Depends(get_role("tech"))
+    ):
+    """Changer le statut d'un lot d'interventions (org), mêmes règles de transition que PATCH /items/{id}.
+    Un UPDATE ... WHERE status = source par statut d'origine et tranche d'ids ; les ids non modifiés sont rejetés
+    avec 404 (introuvable dans l'org) ou 409 (supprimée / transition invalide).
+    """
+
+    ids = list(dict.fromkeys(patch_data.ids))
+    if len(ids) > max_rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Un lot est limité à {max_rows} interventions.")
+
+    new_status = patch_data.status
+    now = datetime.now(timezone.utc)
+    values = {"status": new_status, "updated_at": now}
+    if new_status == InterventionStatus.COMPLETED:
+        values["completed_at"] = now
+    # Statut cible d'abord : les lignes déjà passées par une autre source ne sont pas reprises
+    sources = sorted(allowed_sources(new_status), key=lambda source: source != new_status)
+    applied: list[int] = []
+    changed: list[int] = []
+    deltas = Counter()
+    try:
+        for part in chunks(ids):
+            # Un UPDATE par statut d'origine : les compteurs de l'org se déduisent du RETURNING
+            for source in sources:
+                criteria = (
+                    Intervention.id.in_(part),
+                    Intervention.org_id == current_user.org_id,
+                    Intervention.deleted_at.is_(None),
+                    Intervention.status == source
+                )
+                if source == new_status:
+                    # Déjà dans le statut cible : acceptées sans écriture (updated_at, ETag et cache inchangés)
+                    applied += db.execute(select(Intervention.id).where(*criteria)).scalars().all()
+                    continue
+                rows = db.execute(
+                    update(Intervention)
+                    .where(*criteria)
+                    .values(**values)
+                    .returning(Intervention.id, Intervention.technician_id, Intervention.created_at)
+                ).all()
+                applied += [row.id for row in rows]
+                changed += [row.id for row in rows]
+                for row in rows:
+                    deltas.update(transition_deltas(source, new_status, row.technician_id))
+                change_segments(db, current_user.org_id, rows, new_status, now)
+                if new_status == InterventionStatus.COMPLETED:
+                    record_lead_times(db, current_user.org_id, rows, now)
+                elif source == InterventionStatus.COMPLETED:
+                    clear_lead_times(db, current_user.org_id, [row.id for row in rows])
+        bump(db, current_user.org_id, deltas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="Erreur serveur imprévue lors de la mise à jour des interventions."
+        )
+
+    invalidate_responses(*(("item", item_id) for item_id in changed))
+
+    # Motif du rejet pour les ids restants
+    applied_ids = set(applied)
+    remaining = [item_id for item_id in ids if item_id not in applied_ids]
+    found = {}
+    for part in chunks(remaining):
+        found.update({
+            row.id: row for row in db.execute(
+                select(Intervention.id, Intervention.status, Intervention.deleted_at)
+                .filter(Intervention.id.in_(part), Intervention.org_id == current_user.org_id)
+            ).all()
+        })
+
+    rejected = []
+    for item_id in remaining:
+        row = found.get(item_id)
+        if row is None:
+            rejected.append(BulkItemRejection(id=item_id, status_code=404, detail="Intervention introuvable dans votre organisation."))
+        elif row.deleted_at is not None:
+            rejected.append(BulkItemRejection(id=item_id, status_code=409, detail="Cette intervention est déjà supprimée."))
+        else:
+            rejected.append(BulkItemRejection(id=item_id, status_code=409, detail=f"Transition de statut invalide: {row.status.value} → {new_status.value}"))
+
+    return BulkPatchResult(applied=sorted(applied_ids), rejected=rejected)
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    # Colonnes DateTime sans fuseau, en UTC
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@router.get("/analytics", status_code=status.HTTP_200_OK, response_model=ItemAnalytics)
+def items_analytics(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    technician_id: int | None = None,
+    status_eq: InterventionStatus | None = None,
+    current_role = Depends(get_role("tech")),
+    current_user: Client = Depends(get_current_user),
+    db: Session = Depends(get_db)
+    ):
+    """Temps passé par statut, par technicien : nombre, total et percentiles (p50 / p90 / p95,
+    en secondes) des passages dans un statut terminés dans [start, end) — par défaut les
+    analytics_default_days derniers jours. Lu depuis status_segments, maintenu à chaque
+    changement de statut, sans rejouer la timeline.
+    """
+
+    end = _utc_naive(end) or datetime.now(timezone.utc).replace(tzinfo=None)
+    start = _utc_naive(start) or end - timedelta(days=analytics_default_days)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start doit précéder end.")
+
+    durations = status_durations(db, current_user.org_id, start, end, technician_id, status_eq)
+    return ItemAnalytics.model_validate({"start": start, "end": end, "durations": durations})
+
 @router.get("/{item_id}", status_code=status.HTTP_200_OK, response_model=ItemOut)
 def get_item(
     item_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+    response: Response = None,
     current_user: Client = Depends(get_current_user),
     db: Session = Depends(get_db) 
     ):
-    """Récupérer item (org)."""
-    
-    query = (
-    select(
-        Intervention,
-        Organisation.name.label("org_name"),
-        Client.username.label("client_username"),
-        Technician.username.label("technician_username")
-    )
-    .join(Organisation, Intervention.org_id == Organisation.id)
-    .join(Client, Intervention.client_id == Client.id)
-    .join(Technician, Intervention.technician_id == Technician.id)
-    .filter(Intervention.org_id == current_user.org_id, item_id == Intervention.id)
-    )
-    row = db.execute(query).first()
+    """Récupérer item (org).
+    ETag faible dérivé des updated_at de l'intervention, de son client et de son technicien
+    (usernames inclus dans la réponse) : If-None-Match identique -> 304 sans requête complète.
+    Réponse mise en cache (response_cache), invalidée par les écritures sur l'item, le client ou le technicien.
+    """
+
+    cache_key = (current_user.org_id, "get_item", item_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return conditional(*cached, if_none_match, response)
+    # Capturée avant la lecture en base (voir ResponseCache.generation)
+    generation = response_cache.generation()
+
+    version = db.execute(
+        select(Intervention.updated_at, Client.updated_at.label("client_updated_at"), Technician.updated_at.label("technician_updated_at"))
+        .join(Client, Intervention.client_id == Client.id)
+        .join(Technician, Intervention.technician_id == Technician.id)
+        .filter(Intervention.org_id == current_user.org_id, Intervention.id == item_id)
+    ).first()
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Intervention avec id {item_id} introuvable dans votre organisation.")
+    etag = weak_etag("item", item_id, *version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    row = _item_row(db, current_user.org_id, item_id)
 
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Technicien avec id {item_id} introuvable dans votre organisation.")
     
-    item = ItemOut(
-    id=row.Intervention.id,
-    status=row.Intervention.status,
-    description=row.Intervention.description,
-    client_username=row.client_username,
-    technicien_username=row.technician_username,
-    organisation=row.org_name,
-    created_at=row.Intervention.created_at,
-    updated_at=row.Intervention.updated_at,
-    deleted_at=row.Intervention.deleted_at
-    )
+    item = _item_out(row)
+    response_cache.set(cache_key, (etag, item), tags=[("item", item_id), ("client", row.client_id), ("tech", row.technician_id)], generation=generation)
+    if response is not None:
+        response.headers["ETag"] = etag
     return item
 
 @router.patch("/{item_id}", status_code=status.HTTP_200_OK, response_model=ItemOut)
@@ -196,18 +487,11 @@ def update_item(
     if intervention.deleted_at is not None:
         raise HTTPException(status_code=409, detail="Cette intervention est déjà supprimée.")
     
+    current_status = intervention.status
     if patch_data.status:
-        current_status = intervention.status
         new_status = patch_data.status
 
-        valid_transitions = {
-            InterventionStatus.PENDING: [InterventionStatus.IN_PROGRESS, InterventionStatus.CANCELLED],
-            InterventionStatus.IN_PROGRESS: [InterventionStatus.COMPLETED, InterventionStatus.CANCELLED],
-            InterventionStatus.COMPLETED: [InterventionStatus.CANCELLED],
-            InterventionStatus.CANCELLED: []
-        }
-
-        if new_status != InterventionStatus.CANCELLED and new_status not in valid_transitions[current_status]:
+        if current_status not in allowed_sources(new_status):
             raise HTTPException(
                 status_code=409,
                 detail=f"Transition de statut invalide: {current_status.value} → {new_status.value}"
@@ -219,30 +503,19 @@ def update_item(
         intervention.description = patch_data.description
 
     try:
+        if intervention.status != current_status:
+            _track_transition(db, current_user.org_id, intervention, current_status)
         db.commit()
-        db.refresh(intervention)
     except Exception:
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail="Erreur serveur imprévue lors de la mise à jour de l'intervention."
         )
+    invalidate_responses(("item", item_id))
 
-    client_username = intervention.client.username
-    technician_username = intervention.technician.username
-    organisation_name = intervention.organisation.name
-
-    return ItemOut(
-        id=intervention.id,
-        status=intervention.status,
-        description=intervention.description,
-        client_username=client_username,
-        technicien_username=technician_username,
-        organisation=organisation_name,
-        created_at=intervention.created_at,
-        updated_at=intervention.updated_at,
-        deleted_at=intervention.deleted_at
-    )
+    # Réponse : un seul SELECT joint (pas de refresh ni de lazy-load client / technicien / org)
+    return _item_out(_item_row(db, current_user.org_id, item_id))
 
 @router.delete("/{item_id}", status_code=status.HTTP_200_OK)
 def delete_item(
@@ -274,6 +547,10 @@ def delete_item(
     item.deleted_at = datetime.now(timezone.utc)
 
     try:
+        bump(db, current_user.org_id, item_deltas(item.status, item.technician_id, -1))
+        if item.status == InterventionStatus.COMPLETED:
+            clear_lead_times(db, current_user.org_id, [item.id])
+        close_segments(db, [item.id], item.deleted_at)
         db.commit()
     except Exception:
         db.rollback()
@@ -281,5 +558,6 @@ def delete_item(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur serveur imprévue lors de la suppression de l'intervention."
         )
+    invalidate_responses(("item", item_id))
 
     return {"message" : "Intervention supprimé avec succès."}
\ No newline at end of file
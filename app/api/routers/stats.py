@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+from app.api.deps import get_current_user, get_db, get_role
+from app.models.client import Client
+from app.models.technician import Technician
+from app.models.intervention import InterventionStatus
+from app.models.event import EventType
+from app.models.stats import OrgStat
+from app.schemas.stats import OrgStatsOut, TechnicianLoad
+from app.db.stats import median_lead_time
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=OrgStatsOut)
+def get_stats(
+    current_user: Client = Depends(get_current_user),
+    current_role = Depends(get_role("tech")),
+    db: Session = Depends(get_db)
+    ):
+    """Tableau de bord de l'org : interventions par statut, interventions ouvertes par technicien,
+    évènements par type et médiane du délai création -> completed (en secondes).
+    Lu depuis org_stats seul (maintenu à chaque écriture, médiane par buckets de durée), sans parcourir
+    interventions, events ni lead_times.
+    """
+
+    counters = {
+        (row.metric, row.dimension): row.value
+        for row in db.execute(
+            select(OrgStat.metric, OrgStat.dimension, OrgStat.value).filter(OrgStat.org_id == current_user.org_id)
+        )
+    }
+
+    by_status = {s.value: counters.get(("status", s.value), 0) for s in InterventionStatus}
+    events_by_type = {t.value: counters.get(("events", t.value), 0) for t in EventType}
+
+    open_counts = {int(dimension): value for (metric, dimension), value in counters.items() if metric == "open" and value > 0}
+    usernames = dict(db.execute(
+        select(Technician.id, Technician.username).filter(Technician.id.in_(open_counts), Technician.org_id == current_user.org_id)
+    ).all()) if open_counts else {}
+    open_by_technician = sorted(
+        (TechnicianLoad(technician_id=tech_id, username=usernames.get(tech_id, ""), open=value) for tech_id, value in open_counts.items()),
+        key=lambda load: (-load.open, load.technician_id)
+    )
+
+    return OrgStatsOut(
+        by_status=by_status,
+        open_by_technician=open_by_technician,
+        events_by_type=events_by_type,
+        median_lead_time_seconds=median_lead_time(counters)
+    )
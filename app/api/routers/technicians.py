@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from typing import Annotated, List
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, or_
 from datetime import timezone, datetime
 
-from app.api.deps import get_current_user, get_db, get_role
+from app.api.deps import get_current_user, get_db, get_role, invalidate_principal, sync_only, response_cache, invalidate_responses
 from app.schemas.tech import TechOut, CreateTech, PaginatedTech, PatchTech
 from app.models.technician import Technician
 from app.models.organisation import Organisation
 from app.models.client import Client
-from app.core.security import hash_password
+from app.core.security import hash_password, hash_passwords
+from app.db.search import search_hits
+from app.core.pagination import fetch_page, row_dicts, CountMode
+from app.core.etag import weak_etag, etag_matches, not_modified
+from app.api.bulk import max_rows, existing_values, insert_rows, bulk_result
+from app.schemas.bulk import BulkRowResult, BulkResult
 
 router = APIRouter(prefix="/technicians", tags=["technicians"])
 
 default_limit = 50
 max_limit = 200
 
+# Colonnes projetées sous les noms de TechOut (liste : une seule validation par page)
+tech_columns = (
+    Technician.id, Technician.name, Technician.email, Technician.username,
+    Organisation.name.label("organisation"), Technician.created_at, Technician.deleted_at,
+)
+
 @router.post("", status_code=status.HTTP_201_CREATED)
+@sync_only  # bcrypt : reste sur le threadpool
 def create_technician(
     new_tech: CreateTech,
     current_user: Client = Depends(get_current_user),
@@ -39,7 +52,7 @@ def create_technician(
         raise HTTPException(status_code=400, detail="Cette username est déjà inscrite. Veuillez choisir un autre username.")
 
     hashed_password = hash_password(new_tech.password)
-    tech_to_add = Technician(name=new_tech.name, email=new_tech.email, org_id=current_user.org_id, username=new_tech.username, hashed_password=new_tech.password)
+    tech_to_add = Technician(name=new_tech.name, email=new_tech.email, org_id=current_user.org_id, username=new_tech.username, hashed_password=hashed_password)
     try:
         db.add(tech_to_add)
         db.commit()
@@ -51,70 +64,134 @@ def create_technician(
             detail=f"Erreur serveur imprévue lors de la création du technicien. {e}"
         )
     
+    invalidate_responses(("technicians", current_user.org_id))
     return {"message": f"Nouveau technicien '{new_tech.name}' créé avec succès."}
 
+@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=BulkResult)
+@sync_only  # bcrypt : reste sur le threadpool
+def create_technicians_bulk(
+    new_techs: List[CreateTech],
+    current_user: Client = Depends(get_current_user),
+    current_role = Depends(get_role("tech")),
+    db: Session = Depends(get_db)
+):
+    """Import en masse de techniciens (org courante), avec un résultat par ligne.
+    Les lignes en conflit (avec la base ou plus haut dans le lot) sont rejetées, les autres insérées.
+    """
+
+    if len(new_techs) > max_rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Un import est limité à {max_rows} techniciens.")
+
+    # username unique sur toute la table, email unique par org
+    usernames = existing_values(db, func.lower(Technician.username), (tech.username.lower() for tech in new_techs))
+    emails = existing_values(db, func.lower(Technician.email), (tech.email.lower() for tech in new_techs), Technician.org_id == current_user.org_id)
+
+    results: list[BulkRowResult | None] = [None] * len(new_techs)
+    accepted = []
+    for index, new_tech in enumerate(new_techs):
+        username, email = new_tech.username.lower(), new_tech.email.lower()
+        if email in emails:
+            detail = "Cette adresse email est déjà inscrite. Veuillez choisir une autre adresse."
+        elif username in usernames:
+            detail = "Cette username est déjà inscrite. Veuillez choisir un autre username."
+        else:
+            detail = None
+        if detail:
+            results[index] = BulkRowResult(index=index, status="rejected", detail=detail)
+            continue
+        usernames.add(username)
+        emails.add(email)
+        accepted.append((index, new_tech))
+
+    hashed_passwords = hash_passwords([new_tech.password for _, new_tech in accepted])
+    rows = [
+        (index, {"name": new_tech.name, "email": new_tech.email, "org_id": current_user.org_id, "username": new_tech.username, "hashed_password": hashed_password})
+        for (index, new_tech), hashed_password in zip(accepted, hashed_passwords)
+    ]
+    insert_rows(db, Technician, "tech", rows, results)
+    invalidate_responses(("technicians", current_user.org_id))
+    return bulk_result(results)
+
 @router.get("", status_code=status.HTTP_200_OK, response_model=PaginatedTech)
 def list_technicians(
     q: str | None = None, 
     limit: int = default_limit, 
     offset: int = 0, 
+    count: CountMode = "exact",
+    include_deleted: bool = False,
     current_user: Client = Depends(get_current_user),
     db: Session = Depends(get_db)
     ):
     """Lister techniciens (org).
-    TODO: filtre q (nom/email), pagination.
+    count : exact (défaut, count(*) OVER ()), estimated (planner / cache) ou none (has_more seul).
+    include_deleted : inclure les techniciens supprimés (par défaut, index partiel ix_technicians_org_live).
+    Page mise en cache (response_cache) jusqu'à la prochaine écriture sur les techniciens de l'org.
     """
 
     if limit < 1 or limit > max_limit:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Limit doit être entre 1 et {max_limit}.")
     if offset < 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Offset ne peut pas être négatif.")
+
+    cache_key = (current_user.org_id, "list_technicians", " ".join(q.lower().split()) if q else None, limit, offset, count, include_deleted)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    # Capturée avant la lecture en base (voir ResponseCache.generation)
+    generation = response_cache.generation()
     
     query = (
-    select(Technician, Organisation.name.label("org_name"))
+    select(*tech_columns)
     .join(Organisation, Technician.org_id == Organisation.id)
     .filter(Technician.org_id == current_user.org_id)   
     )
+    if not include_deleted:
+        query = query.filter(Technician.deleted_at.is_(None))
 
-    # Filtre
-    if q:
-        search = f"%{q.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Technician.name).like(search),
-                func.lower(Technician.email).like(search)
-            )
-        )
-    # Total number of results before offset or limit
-    total = db.execute(select(func.count()).select_from(query.subquery())).scalar()
-    query = query.limit(limit).offset(offset)
-    
+    # Filtre : index plein texte (préfixes, trié par pertinence), voir app.db.search
+    hits = search_hits(db, "technicians", current_user.org_id, q) if q else None
+    if hits is not None:
+        hits = hits.subquery()
+        query = query.join(hits, hits.c.id == Technician.id).order_by(hits.c.rank, Technician.id)
     try:
-        rows = db.execute(query).all()
+        page = fetch_page(db, query, limit, offset, count)
     except Exception:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur serveur imprévue.")
     
+    rows = page.rows
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Aucun technicien trouvé pour votre organisation.")
     
-    techniciens = [
-        TechOut(id=row.Technician.id, name=row.Technician.name, email=row.Technician.email, username=row.Technician.username, organisation=row.org_name, created_at=row.Technician.created_at, deleted_at=row.Technician.deleted_at)
-        for row in rows
-    ]
-    return PaginatedTech(
-        total_result=total,
-        limit=limit,
-        offset=offset,
-        techniciens=techniciens
-    )
+    result = PaginatedTech.model_validate({
+        "total_result": page.total,
+        "has_more": page.has_more,
+        "limit": limit,
+        "offset": offset,
+        "techniciens": row_dicts(rows)
+    })
+    response_cache.set(cache_key, result, tags=[("technicians", current_user.org_id)], generation=generation)
+    return result
     
 @router.get("/{tech_id}", status_code=status.HTTP_200_OK, response_model=TechOut)
 def get_technician(
     tech_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+    response: Response = None,
     current_user: Client = Depends(get_current_user),
     db: Session = Depends(get_db) 
     ):
-    """Récupérer technicien (org)."""
+    """Récupérer technicien (org).
+    ETag faible dérivé de updated_at : If-None-Match identique -> 304 sans requête complète.
+    """
+
+    version = db.execute(
+        select(Technician.updated_at).filter(Technician.org_id == current_user.org_id, Technician.id == tech_id)
+    ).first()
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Technicien avec id {tech_id} introuvable dans votre organisation.")
+    etag = weak_etag("tech", tech_id, version.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
     query = (
     select(Technician, Organisation.name.label("org_name"))
@@ -135,6 +212,8 @@ def get_technician(
         created_at=row.Technician.created_at,
         deleted_at=row.Technician.deleted_at
     )
+    if response is not None:
+        response.headers["ETag"] = etag
     return technicien
 
 @router.patch("/{tech_id}", status_code=status.HTTP_200_OK, response_model=TechOut)
@@ -176,33 +255,28 @@ def update_technician(
         if exists:
             raise HTTPException(status_code=409, detail="Cet username est déjà inscrit. Veuillez choisir un autre username.")
         
+    previous_username = tech.username
     for field, value in patch_data.model_dump(exclude_unset=True).items():
         setattr(tech, field, value)
     
     try:
         db.commit()
-        db.refresh(tech)
     except Exception:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur serveur imprévue lors de la mise à jour du technicien."
         )
+    invalidate_principal("tech", previous_username)
+    invalidate_responses(("tech", tech_id), ("technicians", current_user.org_id))
     
+    # Réponse : un seul SELECT joint, sans refresh de l'entité expirée par le commit
     row = db.execute(
-        select(Technician, Organisation.name.label("org_name"))
+        select(*tech_columns)
         .join(Organisation, Technician.org_id == Organisation.id)
-        .filter(Technician.id == tech.id)
+        .filter(Technician.id == tech_id)
     ).first()
-    return TechOut(
-        id=row.Technician.id,
-        name=row.Technician.name,
-        email=row.Technician.email,
-        username=row.Technician.username,
-        organisation=row.org_name,
-        created_at=row.Technician.created_at,
-        deleted_at=row.Technician.deleted_at
-    )
+    return TechOut.model_validate(dict(zip(row._fields, row)))
 
 @router.delete("/{tech_id}", status_code=status.HTTP_200_OK)
 def delete_technician(
@@ -239,5 +313,7 @@ def delete_technician(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur serveur imprévue lors de la suppression du technicien."
         )
+    invalidate_principal("tech", tech.username)
+    invalidate_responses(("tech", tech.id), ("technicians", current_user.org_id))
 
     return {"message" : "Technicien supprimé avec succès."}
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, union_all
+
+from app.api.deps import get_current_user, get_db, get_role, sync_only
+from app.models.client import Client
+from app.models.organisation import Organisation
+from app.models.technician import Technician
+from app.models.event import Event, ArchivedEvent
+from app.models.intervention import Intervention
+from app.schemas.event import EventExport
+from app.core.pagination import encode_cursor, decode_cursor
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+chunk_size = 1000
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+@sync_only  # générateur : lit la session sync pendant le streaming
+def export_events(
+    cursor: str | None = None,
+    limit: int | None = None,
+    current_user: Client = Depends(get_current_user),
+    current_role = Depends(get_role("tech")),
+    db: Session = Depends(get_db)
+    ):
+    """Exporter toute la timeline de l'org en NDJSON, ordre (created_at, id) croissant.
+    Chaque ligne porte l'évènement, le statut et le technicien de son intervention, et un
+    `cursor` : après une coupure, relancer avec le cursor de la dernière ligne reçue.
+    Lecture par lots keyset de chunk_size lignes (ix_event_org_created_id et ix_event_archive_org_created_id) :
+    les évènements archivés (events_archive) sont inclus. `limit` borne l'export.
+    """
+
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Limit doit être positif.")
+    start = decode_cursor(cursor) if cursor else None
+
+    org_name = db.execute(select(Organisation.name).filter(Organisation.id == current_user.org_id)).scalar()
+
+    def source_chunk(source, position, size: int):
+        query = (
+            select(source.id, source.seq, source.type, source.note, source.payload,
+                   source.created_at, source.intervention_id, source.technician_id,
+                   Intervention.status.label("intervention_status"),
+                   Technician.username.label("technician_username"))
+            .join(Intervention, Intervention.id == source.intervention_id)
+            .outerjoin(Technician, Technician.id == Intervention.technician_id)
+            .filter(source.organisation_id == current_user.org_id)
+        )
+        if position:
+            query = query.filter(tuple_(source.created_at, source.id) > tuple_(*position))
+        return query.order_by(source.created_at.asc(), source.id.asc()).limit(size).subquery().select()
+
+    def chunk_query(position, size: int):
+        """Lot suivant sur events + events_archive (id conservés à l'archivage : (created_at, id) reste
+        unique). Chaque table est lue par son index keyset, puis les deux lots sont fusionnés."""
+        merged = union_all(
+            source_chunk(Event, position, size),
+            source_chunk(ArchivedEvent, position, size),
+        ).subquery()
+        return select(merged).order_by(merged.c.created_at.asc(), merged.c.id.asc()).limit(size)
+
+    def lines():
+        position, remaining = start, limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            rows = db.execute(chunk_query(position, size)).all()
+            # Rend la connexion au pool entre deux lots (client lent = pas de connexion bloquée)
+            db.rollback()
+            if not rows:
+                break
+
+            chunk = []
+            for row in rows:
+                position = (row.created_at, row.id)
+                chunk.append(EventExport(**row._mapping, organisation=org_name, cursor=encode_cursor(*position)).model_dump_json() + "\n")
+            yield "".join(chunk)
+
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                break
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
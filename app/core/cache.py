@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from threading import Lock
+from pydantic_core import to_json
+from typing import Any, Callable, Hashable, Iterable
+import time
+
+class TTLCache:
+    """Cache LRU borné en nombre d'entrées, avec expiration (TTL), thread-safe.
+    Les routes sync tournent dans le threadpool : toutes les opérations passent par un verrou.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Supprime les entrées dont la clé satisfait `predicate`, renvoie leur nombre."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def payload_size(value: Any) -> int:
+    """Taille estimée d'une réponse : longueur de sa sérialisation JSON."""
+    return len(to_json(value, fallback=str))
+
+class ResponseCache:
+    """Cache LRU de réponses borné par un budget mémoire (taille JSON estimée), avec TTL.
+    Chaque entrée porte des étiquettes (ex. ("client", 12)) : les écritures invalident
+    précisément les entrées concernées via invalidate_tags. Thread-safe.
+    Course lecture / écriture : un lecteur capture generation() avant de lire la base et la
+    passe à set ; si l'une des étiquettes a été invalidée entre-temps, la valeur (peut-être
+    périmée) n'est pas stockée. Le journal des invalidations est borné (max_invalidations) :
+    une génération plus ancienne que ce qu'il couvre est traitée comme périmée.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, max_invalidations: int = 100_000):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_invalidations = max_invalidations
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self.stale_sets = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any, int, tuple[Hashable, ...]]] = OrderedDict()
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        # Génération courante, génération de la dernière invalidation de chaque étiquette,
+        # et plus haute génération sortie du journal
+        self._generation = 0
+        self._invalidated: OrderedDict[Hashable, int] = OrderedDict()
+        self._forgotten = 0
+        self._lock = Lock()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size, tags = self._data.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self) -> int:
+        """À capturer avant la lecture en base de la valeur qui sera passée à set."""
+        with self._lock:
+            return self._generation
+
+    def _is_stale(self, tags: tuple[Hashable, ...], generation: int) -> bool:
+        if generation < self._forgotten:
+            return True
+        return any(self._invalidated.get(tag, 0) > generation for tag in tags)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (), size: int | None = None, generation: int | None = None) -> None:
+        size = payload_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and self._is_stale(tags, generation):
+                self.stale_sets += 1
+                return
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, size, tags)
+            self.bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def invalidate_tags(self, *tags: Hashable) -> int:
+        """Supprime les entrées portant l'une des étiquettes, renvoie leur nombre."""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self._generation
+                self._invalidated.move_to_end(tag)
+            while len(self._invalidated) > self.max_invalidations:
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten = max(self._forgotten, forgotten)
+            keys = set().union(*(self._tags.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            # Les lectures en cours au moment du clear ne doivent pas repeupler le cache
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten = self._generation
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.stale_sets = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_sets": self.stale_sets,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -7,11 +7,46 @@ load_dotenv()
 class Settings(BaseSettings):
     APP_NAME: str | None = os.getenv("APP_NAME")
     DATABASE_URL: str | None = os.getenv("DATABASE_URL")
+    ASYNC_DB: bool = os.getenv("ASYNC_DB", "false").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
     ALLOWED_ORIGINS: str | None = os.getenv("ALLOWED_ORIGINS")
+
+    # Headers de sécurité (valeur vide = header non envoyé)
+    CONTENT_SECURITY_POLICY: str = os.getenv("CONTENT_SECURITY_POLICY", "")
+    STRICT_TRANSPORT_SECURITY: str = os.getenv("STRICT_TRANSPORT_SECURITY", "max-age=63072000; includeSubDomains; preload")
+    REFERRER_POLICY: str = os.getenv("REFERRER_POLICY", "no-referrer")
+    PERMISSIONS_POLICY: str = os.getenv("PERMISSIONS_POLICY", "geolocation=()")
+    X_FRAME_OPTIONS: str = os.getenv("X_FRAME_OPTIONS", "DENY")
+    X_XSS_PROTECTION: str = os.getenv("X_XSS_PROTECTION", "1; mode=block")
     SECRET_KEY: str | None = os.getenv("SECRET_KEY")
     ALGORITHM: str | None = os.getenv("ALGORITHM")
     TOKEN_EXPIRES_MINUTES: int = int(os.getenv("TOKEN_EXPIRES_MINUTES", "30"))
 
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_MAXSIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "10000"))
+    COUNT_CACHE_TTL_SECONDS: int = int(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+    COUNT_CACHE_MAXSIZE: int = int(os.getenv("COUNT_CACHE_MAXSIZE", "1000"))
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+
+    # Archivage des timelines (scripts/archive_events.py)
+    EVENT_ARCHIVE_AFTER_DAYS: int = int(os.getenv("EVENT_ARCHIVE_AFTER_DAYS", "90"))
+    EVENT_ARCHIVE_BATCH_SIZE: int = int(os.getenv("EVENT_ARCHIVE_BATCH_SIZE", "1000"))
+    # Event.payload : JSON compressé (zlib) au-delà de cette taille, en octets
+    EVENT_PAYLOAD_COMPRESS_MIN_BYTES: int = int(os.getenv("EVENT_PAYLOAD_COMPRESS_MIN_BYTES", "1024"))
+
+    # Purge des lignes supprimées (scripts/purge_deleted.py)
+    PURGE_AFTER_DAYS: int = int(os.getenv("PURGE_AFTER_DAYS", "365"))
+    PURGE_BATCH_SIZE: int = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+    PURGE_THROTTLE_SECONDS: float = float(os.getenv("PURGE_THROTTLE_SECONDS", "0.1"))
+
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_QUEUE_DEPTH: int = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "64"))
+
     POSTGRES_HOST: str | None = os.getenv("POSTGRES_HOST")
     POSTGRES_USER: str | None = os.getenv("POSTGRES_USER")
     POSTGRES_PASSWORD: str | None= os.getenv("POSTGRES_PASSWORD")
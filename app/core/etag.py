@@ -0,0 +1,27 @@
+from fastapi import Response, status
+import hashlib
+
+def weak_etag(*parts) -> str:
+    """ETag faible (W/"...") dérivé des valeurs de version d'une ressource."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparaison faible (RFC 9110) entre If-None-Match et l'ETag courant."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+def conditional(etag: str, body, if_none_match: str | None, response: Response | None):
+    """304 si If-None-Match correspond à etag, sinon body avec le header ETag."""
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if response is not None:
+        response.headers["ETag"] = etag
+    return body
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+import asyncio
+
+@dataclass(eq=False)
+class Subscription:
+    """Abonné à la timeline d'une intervention (une connexion SSE).
+    `lagging` passe à True si la file déborde : l'abonné doit se resynchroniser depuis la base.
+    """
+    intervention_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(repr=False)
+    lagging: bool = False
+
+class EventBroker:
+    """Pub/sub en mémoire du processus pour les nouveaux évènements de timeline.
+    - Abonnés rangés par org puis par intervention : un publish ne parcourt que les siens.
+    - publish est appelé depuis le threadpool (create_event) : la remise passe par
+      loop.call_soon_threadsafe vers la boucle de chaque abonné.
+    - File bornée par abonné : un client lent ne bloque ni l'écrivain ni les autres abonnés,
+      il est marqué `lagging` et rejoue la base (seq) au lieu d'accumuler des messages.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: dict[int, dict[int, set[Subscription]]] = {}
+        self._lock = Lock()
+
+    def subscribe(self, org_id: int, intervention_id: int) -> Subscription:
+        """À appeler depuis la boucle asyncio qui consommera la file."""
+        subscription = Subscription(intervention_id, asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(org_id, {}).setdefault(intervention_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, org_id: int, subscription: Subscription) -> None:
+        with self._lock:
+            by_intervention = self._subscribers.get(org_id, {})
+            subscribers = by_intervention.get(subscription.intervention_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                by_intervention.pop(subscription.intervention_id, None)
+            if not by_intervention:
+                self._subscribers.pop(org_id, None)
+
+    def has_subscribers(self, org_id: int, intervention_id: int) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(org_id, {}).get(intervention_id))
+
+    def publish(self, org_id: int, intervention_id: int, message: Any) -> int:
+        """Diffuse `message` aux abonnés de l'intervention, renvoie leur nombre. Thread-safe."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(org_id, {}).get(intervention_id, ()))
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, message)
+            except RuntimeError:
+                # Boucle fermée (arrêt du worker) : l'abonné disparaît avec elle
+                self.unsubscribe(org_id, subscription)
+        return len(subscribers)
+
+    def _deliver(self, subscription: Subscription, message: Any) -> None:
+        if subscription.queue.full():
+            subscription.lagging = True
+            self.dropped += 1
+            return
+        subscription.queue.put_nowait(message)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "subscribers": sum(len(s) for by_intervention in self._subscribers.values() for s in by_intervention.values()),
+                "orgs": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+            }
@@ -1,26 +1,55 @@
-from fastapi import Request
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore
+import asyncio
 
 from app.core.config import settings
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Headers de sécurité basiques.
-    TODO (bonus): CSP, autres policies, etc.
+def security_headers() -> Dict[str, str]:
+    """Headers de sécurité configurés dans Settings (valeur vide = header désactivé)."""
+    return {
+        "X-Content-Type-Options": "nosniff",
+        "Referrer-Policy": settings.REFERRER_POLICY,
+        "Strict-Transport-Security": settings.STRICT_TRANSPORT_SECURITY,
+        "Permissions-Policy": settings.PERMISSIONS_POLICY,
+        "Content-Security-Policy": settings.CONTENT_SECURITY_POLICY,
+        "X-Frame-Options": settings.X_FRAME_OPTIONS,
+        "X-XSS-Protection": settings.X_XSS_PROTECTION,
+    }
+
+class SecurityHeadersMiddleware:
+    """Headers de sécurité, en middleware ASGI pur.
+    La liste encodée est calculée une fois ; chaque réponse la reçoit dans
+    http.response.start, sans tâche ni enveloppe de réponse (streaming intact).
+    Les headers déjà posés par la route sous le même nom sont remplacés.
     """
-    async def dispatch(self, request: Request, call_next):
-        resp = await call_next(request)
-        resp.headers["X-Content-Type-Options"] = "nosniff"
-        resp.headers["Referrer-Policy"] = "no-referrer"
-        resp.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
-        resp.headers["Permissions-Policy"] = "geolocation=()"
+    def __init__(self, app: ASGIApp, headers: Dict[str, str] | None = None):
+        self.app = app
+        headers = security_headers() if headers is None else headers
+        self.raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items() if value
+        ]
+        self.raw_names = {name for name, _ in self.raw_headers}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [header for header in message.get("headers", []) if header[0].lower() not in self.raw_names]
+                headers.extend(self.raw_headers)
+                message["headers"] = headers
+            await send(message)
 
-        resp.headers["X-Frame-Options"] = "DENY"
-        resp.headers["X-XSS-Protection"] = "1; mode=block"
-        return resp
+        await self.app(scope, receive, send_with_headers)
 
 # JWT
 SECRET_KEY = settings.SECRET_KEY
@@ -29,11 +58,46 @@ TOKEN_EXPIRE_MINUTES = int(settings.TOKEN_EXPIRES_MINUTES)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool dédié à bcrypt : borne le CPU consommé par le hachage et ne bloque jamais l'event loop.
+# Au-delà de workers + queue, les demandes sont refusées (503) plutôt que mises en attente sans fin.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH)
+
+def _submit_hash_job(fn: Callable[..., Any], *args: Any) -> Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de demandes d'authentification en cours, veuillez réessayer."
+        )
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _submit_hash_job(pwd_context.hash, password).result()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit_hash_job(pwd_context.verify, plain_password, hashed_password).result()
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hache un lot de mots de passe en parallèle sur le pool bcrypt (imports en masse).
+    Au plus PASSWORD_HASH_WORKERS hachages du lot en vol : la file reste libre pour les logins.
+    """
+    in_flight = BoundedSemaphore(settings.PASSWORD_HASH_WORKERS)
+    futures = []
+    for password in passwords:
+        in_flight.acquire()
+        _hash_slots.acquire()
+        future = _hash_executor.submit(pwd_context.hash, password)
+        future.add_done_callback(lambda _: (_hash_slots.release(), in_flight.release()))
+        futures.append(future)
+    return [future.result() for future in futures]
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit_hash_job(pwd_context.hash, password))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit_hash_job(pwd_context.verify, plain_password, hashed_password))
 
 def create_access_token(data: Dict[str, Any]) -> str:
     to_encode = data.copy()
@@ -0,0 +1,50 @@
+# Archivage des timelines d'interventions clôturées (table events_archive, voir app.models.event).
+# Une intervention est archivable quand elle est terminée / annulée depuis plus de N jours
+# (updated_at, modifié à chaque changement de statut) ou supprimée depuis plus de N jours.
+# Les évènements sont déplacés par lots (INSERT ... SELECT puis DELETE sur les mêmes id) :
+# une transaction par lot, donc des verrous et un journal bornés, et un arrêt en cours de
+# route ne laisse rien à moitié déplacé. Relancer le job reprend là où il s'est arrêté.
+
+from datetime import datetime, timezone
+from sqlalchemy import select, insert, delete, or_, and_, literal
+from sqlalchemy.orm import Session
+
+from app.models.intervention import Intervention, InterventionStatus
+from app.models.event import Event, ArchivedEvent
+
+closed_statuses = (InterventionStatus.COMPLETED, InterventionStatus.CANCELLED)
+
+archived_columns = ("id", "type", "note", "payload", "created_at", "seq", "intervention_id", "organisation_id", "technician_id")
+
+def archivable(cutoff: datetime):
+    """Interventions clôturées ou supprimées avant cutoff (UTC naïf, comme les colonnes)."""
+    return or_(
+        and_(Intervention.status.in_(closed_statuses), Intervention.updated_at < cutoff),
+        Intervention.deleted_at < cutoff,
+    )
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    """Déplace au plus batch_size évènements archivables d'id > after_id (ordre des id), sans commit.
+    Renvoie les id déplacés ; le dernier sert de curseur pour le lot suivant.
+    """
+    query = (
+        select(Event.id)
+        .join(Intervention, Intervention.id == Event.intervention_id)
+        .filter(Event.id > after_id, archivable(cutoff))
+        .order_by(Event.id)
+        .limit(batch_size)
+    )
+    if org_id is not None:
+        query = query.filter(Event.organisation_id == org_id)
+    ids = db.execute(query).scalars().all()
+    if not ids:
+        return []
+    archived_at = literal(datetime.now(timezone.utc).replace(tzinfo=None), ArchivedEvent.archived_at.type)
+    db.execute(
+        insert(ArchivedEvent).from_select(
+            [*archived_columns, "archived_at"],
+            select(*(getattr(Event, name) for name in archived_columns), archived_at).filter(Event.id.in_(ids)),
+        )
+    )
+    db.execute(delete(Event).where(Event.id.in_(ids)))
+    return ids
@@ -0,0 +1,143 @@
+# Purge définitive des lignes supprimées (soft delete) après le délai de rétention.
+# Règles de DESIGN.md appliquées explicitement, enfants d'abord, au lieu de laisser un DELETE
+# parent cascader en une seule transaction (et SQLite n'applique pas les FK par défaut) :
+# - CASCADE  Client -> Interventions -> Events : les interventions d'un client purgé sont purgées,
+#            leurs évènements (events et events_archive) d'abord.
+# - RESTRICT Technician -> Interventions : un technicien encore référencé (intervention ou segment
+#            de statut) est ignoré jusqu'à ce que ses interventions aient disparu.
+# - SET NULL Event.technician_id : remis à NULL avant la suppression du technicien.
+# Les tables dérivées suivent : org_stats (compteurs décrémentés), lead_times, status_segments,
+# principals (les évènements ORM ne voient pas les DELETE en masse). L'index FTS est nettoyé par
+# ses triggers (SQLite) ou avec la ligne (Postgres).
+# Chaque fonction *_batch traite au plus batch_size lignes d'id > after_id (ordre des id), sans
+# commit : l'appelant commite un lot par transaction. Les critères ne dépendent que de la base,
+# donc relancer après une interruption reprend simplement ce qui reste.
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import select, update, delete, or_, exists
+from sqlalchemy.orm import Session
+
+from app.db.stats import bump, item_deltas, clear_lead_times
+from app.models.client import Client
+from app.models.technician import Technician
+from app.models.intervention import Intervention
+from app.models.event import Event, ArchivedEvent
+from app.models.principal import Principal
+from app.models.stats import StatusSegment
+
+def purgeable_interventions(cutoff: datetime):
+    """Interventions supprimées avant cutoff, ou dont le client l'est (CASCADE)."""
+    return or_(
+        Intervention.deleted_at < cutoff,
+        Intervention.client_id.in_(select(Client.id).filter(Client.deleted_at < cutoff)),
+    )
+
+def _purge_events_batch(db: Session, source, cutoff: datetime, batch_size: int, after_id: int, org_id: int | None) -> list[int]:
+    query = (
+        select(source.id, source.organisation_id, source.type)
+        .join(Intervention, Intervention.id == source.intervention_id)
+        .filter(source.id > after_id, purgeable_interventions(cutoff))
+        .order_by(source.id)
+        .limit(batch_size)
+    )
+    if org_id is not None:
+        query = query.filter(source.organisation_id == org_id)
+    rows = db.execute(query).all()
+    if not rows:
+        return []
+    deltas = defaultdict(Counter)
+    for row in rows:
+        deltas[row.organisation_id][("events", row.type.value)] -= 1
+    for row_org_id, counter in deltas.items():
+        bump(db, row_org_id, counter)
+    ids = [row.id for row in rows]
+    db.execute(delete(source).where(source.id.in_(ids)))
+    return ids
+
+def purge_events_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    return _purge_events_batch(db, Event, cutoff, batch_size, after_id, org_id)
+
+def purge_archived_events_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    return _purge_events_batch(db, ArchivedEvent, cutoff, batch_size, after_id, org_id)
+
+def purge_interventions_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    """Interventions purgeables sans évènement restant (un évènement écrit depuis les étapes
+    précédentes reporte l'intervention au prochain passage)."""
+    query = (
+        select(Intervention.id, Intervention.org_id, Intervention.status, Intervention.technician_id, Intervention.deleted_at)
+        .filter(
+            Intervention.id > after_id,
+            purgeable_interventions(cutoff),
+            ~exists().where(Event.intervention_id == Intervention.id),
+            ~exists().where(ArchivedEvent.intervention_id == Intervention.id),
+        )
+        .order_by(Intervention.id)
+        .limit(batch_size)
+    )
+    if org_id is not None:
+        query = query.filter(Intervention.org_id == org_id)
+    rows = db.execute(query).all()
+    if not rows:
+        return []
+    # Les interventions encore vivantes (client purgé) sortent des compteurs ; les supprimées en sont déjà sorties
+    deltas = defaultdict(Counter)
+    ids_by_org = defaultdict(list)
+    for row in rows:
+        ids_by_org[row.org_id].append(row.id)
+        if row.deleted_at is None:
+            deltas[row.org_id].update(item_deltas(row.status, row.technician_id, -1))
+    for row_org_id, counter in deltas.items():
+        bump(db, row_org_id, counter)
+    for row_org_id, org_ids in ids_by_org.items():
+        clear_lead_times(db, row_org_id, org_ids)
+    ids = [row.id for row in rows]
+    db.execute(delete(StatusSegment).where(StatusSegment.intervention_id.in_(ids)))
+    db.execute(delete(Intervention).where(Intervention.id.in_(ids)))
+    return ids
+
+def purge_clients_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    query = (
+        select(Client.id)
+        .filter(Client.id > after_id, Client.deleted_at < cutoff, ~exists().where(Intervention.client_id == Client.id))
+        .order_by(Client.id)
+        .limit(batch_size)
+    )
+    if org_id is not None:
+        query = query.filter(Client.org_id == org_id)
+    ids = db.execute(query).scalars().all()
+    if ids:
+        db.execute(delete(Principal).where(Principal.role == "client", Principal.principal_id.in_(ids)))
+        db.execute(delete(Client).where(Client.id.in_(ids)))
+    return ids
+
+def purge_technicians_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0, org_id: int | None = None) -> list[int]:
+    query = (
+        select(Technician.id)
+        .filter(
+            Technician.id > after_id,
+            Technician.deleted_at < cutoff,
+            ~exists().where(Intervention.technician_id == Technician.id),
+            ~exists().where(StatusSegment.technician_id == Technician.id),
+        )
+        .order_by(Technician.id)
+        .limit(batch_size)
+    )
+    if org_id is not None:
+        query = query.filter(Technician.org_id == org_id)
+    ids = db.execute(query).scalars().all()
+    if ids:
+        for source in (Event, ArchivedEvent):
+            db.execute(update(source).where(source.technician_id.in_(ids)).values(technician_id=None))
+        db.execute(delete(Principal).where(Principal.role == "tech", Principal.principal_id.in_(ids)))
+        db.execute(delete(Technician).where(Technician.id.in_(ids)))
+    return ids
+
+# Ordre d'exécution : enfants avant parents
+purge_steps = {
+    "events": purge_events_batch,
+    "events_archive": purge_archived_events_batch,
+    "interventions": purge_interventions_batch,
+    "clients": purge_clients_batch,
+    "technicians": purge_technicians_batch,
+}
@@ -0,0 +1,124 @@
+# Index de recherche plein texte pour le filtre `q` des listes clients / techniciens / items.
+# - SQLite : tables FTS5 (external content) synchronisées par triggers, rang bm25. org_id est
+#   indexé comme première colonne et fait partie du MATCH : la recherche ne parcourt que l'org.
+# - Postgres : index GIN composites (btree_gin) sur (org_id, tsvector 'simple') et
+#   (org_id, trigrammes pg_trgm de lower(username)).
+# Le DDL est posé à la création des tables (create_all) ; les migrations 0006 / 0015 en gardent
+# chacune une copie figée.
+
+from sqlalchemy import event, select, table, column, text, func, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+import re
+
+from app.models.client import Client
+from app.models.technician import Technician
+
+# Colonnes indexées par table ; "document" = champs du q des listes, "username" = q des items
+FTS_COLUMNS = {
+    "clients": ("org_id", "username", "first_name", "last_name", "email"),
+    "technicians": ("org_id", "username", "name", "email"),
+}
+DOCUMENT_COLUMNS = {
+    "clients": ("first_name", "last_name", "email"),
+    "technicians": ("name", "email"),
+}
+
+def _tsvector_sql(table_name: str) -> str:
+    parts = " || ' ' || ".join(f"coalesce({table_name}.{col}, '')" for col in DOCUMENT_COLUMNS[table_name])
+    return f"to_tsvector('simple', {parts})"
+
+def sqlite_ddl(table_name: str) -> list[str]:
+    cols = FTS_COLUMNS[table_name]
+    fts = f"{table_name}_fts"
+    names = ", ".join(cols)
+    new_values = ", ".join(f"new.{col}" for col in cols)
+    old_values = ", ".join(f"old.{col}" for col in cols)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table_name}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        # org_id ne sert qu'au filtrage : poids nul dans bm25
+        f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({', '.join(['0'] + ['1'] * (len(cols) - 1))})')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+
+def postgres_ddl(table_name: str) -> list[str]:
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_tsv ON {table_name} USING gin (org_id, {_tsvector_sql(table_name)})",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_username_trgm ON {table_name} USING gin (org_id, lower(username) gin_trgm_ops)",
+    ]
+
+def is_search_object(name: str | None) -> bool:
+    """Objets créés hors metadata (tables FTS5 et leurs tables internes, index GIN) : ignorés par l'autogénération."""
+    return bool(name) and any(
+        name.startswith(f"{t}_fts") or name in (f"ix_{t}_search_tsv", f"ix_{t}_username_trgm") for t in FTS_COLUMNS
+    )
+
+def _install(target, connection, **kw):
+    ddl = {"sqlite": sqlite_ddl, "postgresql": postgres_ddl}.get(connection.dialect.name)
+    if ddl:
+        for statement in ddl(target.name):
+            connection.exec_driver_sql(statement)
+
+def _uninstall(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {target.name}_fts")
+
+for _model in (Client, Technician):
+    event.listen(_model.__table__, "after_create", _install)
+    event.listen(_model.__table__, "before_drop", _uninstall)
+
+def search_terms(q: str) -> list[str]:
+    """Mots du filtre q (on ignore ceux sans caractère alphanumérique)."""
+    return [term for term in q.lower().split() if re.search(r"\w", term)]
+
+def _fts_match(org_id: int, terms: list[str], columns: tuple[str, ...]) -> str:
+    # Chaque mot devient une phrase préfixe ("mot"*), combinées en ET, restreintes à l'org
+    phrases = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+    return f'org_id : "{int(org_id)}" AND ' + "{" + " ".join(columns) + "}: (" + phrases + ")"
+
+def _tsquery(terms: list[str]) -> str:
+    return " & ".join("'" + term.replace("'", "''") + "':*" for term in terms)
+
+def search_hits(db: Session, table_name: str, org_id: int, q: str, field: str = "document") -> Select | None:
+    """SELECT (id, rank) des lignes de `table_name` de l'org correspondant à q, rank croissant = meilleur.
+    Le filtre d'org est appliqué dans l'index (MATCH / colonne de tête des index GIN), pas après coup.
+    field="document" : champs de DOCUMENT_COLUMNS, field="username" : username seul.
+    None si q ne contient aucun mot cherchable.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return None
+    columns = DOCUMENT_COLUMNS[table_name] if field == "document" else ("username",)
+
+    if db.get_bind().dialect.name == "postgresql":
+        model_table = {"clients": Client, "technicians": Technician}[table_name].__table__
+        if field == "document":
+            tsvector = literal_column(_tsvector_sql(table_name))
+            tsquery = func.to_tsquery(literal_column("'simple'"), _tsquery(terms))
+            return (
+                select(model_table.c.id.label("id"), (-func.ts_rank(tsvector, tsquery)).label("rank"))
+                .where(model_table.c.org_id == org_id, tsvector.op("@@")(tsquery))
+            )
+        username = func.lower(model_table.c.username)
+        query = (
+            select(model_table.c.id.label("id"), (-func.similarity(username, " ".join(terms))).label("rank"))
+            .where(model_table.c.org_id == org_id)
+        )
+        for term in terms:
+            query = query.where(username.contains(term, autoescape=True))
+        return query
+
+    fts = table(f"{table_name}_fts", column("rowid"), column("rank"))
+    return (
+        select(fts.c.rowid.label("id"), fts.c.rank.label("rank"))
+        .where(text(f"{table_name}_fts MATCH :match").bindparams(match=_fts_match(org_id, terms, columns)))
+    )
@@ -1,17 +1,36 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
 
+def _pool_args(url: str) -> dict:
+    # SQLite en mémoire : pool à connexion unique, pas de dimensionnement possible
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
 def _make_engine(url: str):
     # SQLite fichier nécessite 'check_same_thread=False'
     connect_args = {}
     if url.startswith("sqlite"):
         connect_args = {"check_same_thread": False}
-    return create_engine(url, pool_pre_ping=True, future=True, connect_args=connect_args)
+    return create_engine(url, pool_pre_ping=True, future=True, connect_args=connect_args, **_pool_args(url))
+
+def _async_url(url: str) -> str:
+    """Même base que DATABASE_URL, avec le driver async : aiosqlite en local, psycopg (v3) pour Postgres."""
+    scheme, sep, rest = url.partition("://")
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme.startswith("postgresql") or scheme == "postgres":
+        return f"postgresql+psycopg{sep}{rest}"
+    return url
 
 engine = _make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(_async_url(settings.DATABASE_URL), pool_pre_ping=True, **_pool_args(settings.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, class_=AsyncSession)
+
 def get_db():
     """Dépendance FastAPI pour une session DB.
     TODO: utilisez-la dans vos routes une fois la persistance implémentée.
@@ -21,3 +40,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dépendance FastAPI pour une AsyncSession (routes async, voir app.api.routers.aio)."""
+    async with AsyncSessionLocal() as db:
+        yield db
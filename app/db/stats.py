@@ -0,0 +1,260 @@
+# Maintenance des statistiques par org (tables org_stats / lead_times, voir app.models.stats).
+# Les handlers d'écriture calculent des deltas et les appliquent par upsert dans leur propre
+# transaction : le compteur et la ligne modifiée sont commités ensemble.
+# Métriques (metric -> dimension) :
+# - "status" -> statut       : interventions non supprimées par statut
+# - "open"   -> technician_id: interventions ouvertes (pending / in_progress) par technicien
+# - "events" -> type         : évènements de timeline par type
+# - "lead_bucket" -> k        : interventions terminées dont la durée création -> completed tombe
+#                               dans le bucket logarithmique k (lead_bucket), sert la médiane
+# Temps par statut : status_segments, un segment ouvert par intervention (open_segments /
+# close_segments à chaque changement de statut), lu par GET /items/analytics.
+
+from collections import Counter
+import math
+from datetime import datetime
+from itertools import groupby
+from sqlalchemy import select, update, delete, insert, func, literal, cast, Integer
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.intervention import Intervention, InterventionStatus
+from app.models.event import Event, ArchivedEvent
+from app.models.technician import Technician
+from app.models.stats import OrgStat, LeadTime, StatusSegment
+
+open_statuses = (InterventionStatus.PENDING, InterventionStatus.IN_PROGRESS)
+
+def item_deltas(status: InterventionStatus, technician_id: int, sign: int = 1) -> Counter:
+    """Contribution d'une intervention (non supprimée) aux compteurs, signée."""
+    deltas = Counter({("status", status.value): sign})
+    if status in open_statuses:
+        deltas[("open", str(technician_id))] += sign
+    return deltas
+
+def transition_deltas(old: InterventionStatus, new: InterventionStatus, technician_id: int, count: int = 1) -> Counter:
+    deltas = item_deltas(new, technician_id, count)
+    deltas.update(item_deltas(old, technician_id, -count))
+    return deltas
+
+def bump(db: Session, org_id: int, deltas: Counter) -> None:
+    """Applique les deltas aux compteurs de l'org (upsert value = value + delta)."""
+    rows = [
+        {"org_id": org_id, "metric": metric, "dimension": dimension, "value": value}
+        for (metric, dimension), value in deltas.items() if value
+    ]
+    if not rows:
+        return
+    table = OrgStat.__table__
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(table).values(rows)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.org_id, table.c.metric, table.c.dimension],
+            set_={"value": table.c.value + statement.excluded.value}
+        ))
+        return
+    for row in rows:
+        updated = db.execute(
+            update(table)
+            .where(table.c.org_id == org_id, table.c.metric == row["metric"], table.c.dimension == row["dimension"])
+            .values(value=table.c.value + row["value"])
+        )
+        if not updated.rowcount:
+            db.execute(insert(table).values(**row))
+
+def lead_seconds(created_at: datetime, completed_at: datetime) -> int:
+    # Colonnes DateTime sans fuseau : tout est en UTC, on compare en naïf
+    delta = completed_at.replace(tzinfo=None) - created_at.replace(tzinfo=None)
+    return max(int(delta.total_seconds()), 0)
+
+# Buckets logarithmiques des durées : lead_buckets_per_octave par doublement, soit ~1,1 % de
+# largeur relative ; la médiane est estimée au centre (géométrique) de son bucket.
+lead_buckets_per_octave = 64
+
+def lead_bucket(seconds: int) -> int:
+    return int(math.log2(seconds + 1) * lead_buckets_per_octave)
+
+def lead_bucket_value(bucket: int) -> float:
+    return 2 ** ((bucket + 0.5) / lead_buckets_per_octave) - 1
+
+def lead_deltas(seconds: list[int], sign: int = 1) -> Counter:
+    deltas = Counter()
+    for value in seconds:
+        deltas[("lead_bucket", str(lead_bucket(value)))] += sign
+    return deltas
+
+def _stored_lead_seconds(db: Session, intervention_ids: list[int]) -> list[int]:
+    return db.execute(select(LeadTime.seconds).filter(LeadTime.intervention_id.in_(intervention_ids))).scalars().all()
+
+def record_lead_times(db: Session, org_id: int, rows, completed_at: datetime) -> None:
+    """rows : (id, created_at) des interventions qui passent à completed."""
+    values = [
+        {"intervention_id": row.id, "org_id": org_id, "seconds": lead_seconds(row.created_at, completed_at)}
+        for row in rows
+    ]
+    if values:
+        ids = [v["intervention_id"] for v in values]
+        deltas = lead_deltas(_stored_lead_seconds(db, ids), -1)
+        deltas.update(lead_deltas([v["seconds"] for v in values]))
+        bump(db, org_id, deltas)
+        db.execute(delete(LeadTime).where(LeadTime.intervention_id.in_(ids)))
+        db.execute(insert(LeadTime), values)
+
+def clear_lead_times(db: Session, org_id: int, intervention_ids: list[int]) -> None:
+    """Interventions qui quittent completed (annulation) ou sont supprimées."""
+    if intervention_ids:
+        bump(db, org_id, lead_deltas(_stored_lead_seconds(db, intervention_ids), -1))
+        db.execute(delete(LeadTime).where(LeadTime.intervention_id.in_(intervention_ids)))
+
+def median_lead_time(counters: dict) -> float | None:
+    """Médiane estimée depuis les compteurs "lead_bucket" de l'org (déjà lus avec org_stats) :
+    O(nombre de buckets occupés), indépendant du nombre d'interventions terminées.
+    """
+    buckets = sorted((int(dimension), value) for (metric, dimension), value in counters.items() if metric == "lead_bucket" and value > 0)
+    total = sum(value for _, value in buckets)
+    if not total:
+        return None
+    # Rang(s) du milieu (deux si total est pair), 0-indexés
+    ranks = sorted({(total - 1) // 2, total // 2})
+    estimates = []
+    seen = 0
+    for bucket, value in buckets:
+        seen += value
+        while ranks and ranks[0] < seen:
+            ranks.pop(0)
+            estimates.append(lead_bucket_value(bucket))
+    return sum(estimates) / len(estimates)
+
+def elapsed_seconds(db: Session, start, end):
+    """Expression SQL : secondes entières entre deux DateTime (colonnes ou valeurs)."""
+    if db.get_bind().dialect.name == "sqlite":
+        return cast((func.julianday(end) - func.julianday(start)) * 86400, Integer)
+    return cast(func.extract("epoch", end - start), Integer)
+
+def open_segments(db: Session, org_id: int, rows, status: InterventionStatus, started_at: datetime) -> None:
+    """rows : (id, technician_id) des interventions qui entrent dans `status` à started_at."""
+    values = [
+        {"intervention_id": row.id, "org_id": org_id, "technician_id": row.technician_id, "status": status, "started_at": started_at.replace(tzinfo=None)}
+        for row in rows
+    ]
+    if values:
+        db.execute(insert(StatusSegment), values)
+
+def close_segments(db: Session, intervention_ids: list[int], ended_at: datetime) -> None:
+    """Ferme le segment ouvert de chaque intervention, durée calculée par la base (un seul UPDATE)."""
+    if intervention_ids:
+        ended = literal(ended_at.replace(tzinfo=None), StatusSegment.ended_at.type)
+        db.execute(
+            update(StatusSegment)
+            .where(StatusSegment.intervention_id.in_(intervention_ids), StatusSegment.ended_at.is_(None))
+            .values(ended_at=ended, seconds=elapsed_seconds(db, StatusSegment.started_at, ended))
+        )
+
+def change_segments(db: Session, org_id: int, rows, status: InterventionStatus, at: datetime) -> None:
+    """Changement de statut : ferme les segments en cours et ouvre ceux du nouveau statut."""
+    close_segments(db, [row.id for row in rows], at)
+    open_segments(db, org_id, rows, status, at)
+
+percentile_levels = (0.5, 0.9, 0.95)
+
+def percentile(values: list[int], level: float) -> float:
+    """Percentile d'une liste triée, interpolation linéaire (même définition que percentile_cont)."""
+    position = (len(values) - 1) * level
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def status_durations(db: Session, org_id: int, start: datetime, end: datetime,
+                     technician_id: int | None = None, status: InterventionStatus | None = None) -> list[dict]:
+    """Segments terminés dans [start, end), agrégés par (technicien, statut) : nombre, total et
+    percentiles (percentile_levels) des durées. Lecture par ix_status_segment_org_ended ;
+    Postgres calcule les percentiles (percentile_cont), ailleurs on les calcule sur les durées triées.
+    """
+    filters = [StatusSegment.org_id == org_id, StatusSegment.ended_at >= start, StatusSegment.ended_at < end]
+    if technician_id is not None:
+        filters.append(StatusSegment.technician_id == technician_id)
+    if status is not None:
+        filters.append(StatusSegment.status == status)
+    keys = (StatusSegment.technician_id, Technician.username, StatusSegment.status)
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(
+            select(*keys, func.count(), func.sum(StatusSegment.seconds),
+                   *(func.percentile_cont(level).within_group(StatusSegment.seconds) for level in percentile_levels))
+            .join(Technician, Technician.id == StatusSegment.technician_id)
+            .filter(*filters)
+            .group_by(*keys)
+            .order_by(StatusSegment.technician_id, StatusSegment.status)
+        ).all()
+        groups = [(row[:3], row[3], row[4], row[5:]) for row in rows]
+    else:
+        rows = db.execute(
+            select(*keys, StatusSegment.seconds)
+            .join(Technician, Technician.id == StatusSegment.technician_id)
+            .filter(*filters)
+            .order_by(StatusSegment.technician_id, StatusSegment.status, StatusSegment.seconds)
+        ).all()
+        groups = []
+        for key, group in groupby(rows, key=lambda row: tuple(row[:3])):
+            seconds = [row[3] for row in group]
+            groups.append((key, len(seconds), sum(seconds), [percentile(seconds, level) for level in percentile_levels]))
+
+    return [
+        {
+            "technician_id": tech_id, "technician_username": username, "status": segment_status.value,
+            "count": count, "total_seconds": int(total or 0),
+            **{f"p{round(level * 100)}_seconds": float(value) for level, value in zip(percentile_levels, values)},
+        }
+        for (tech_id, username, segment_status), count, total, values in groups
+    ]
+
+# --- Recalcul complet (scripts/rebuild_stats.py) ---
+
+def compute_stats(db: Session, org_id: int) -> tuple[Counter, dict[int, int]]:
+    """Compteurs et durées recalculés depuis interventions / events / events_archive."""
+    counters = Counter()
+    live = (Intervention.org_id == org_id, Intervention.deleted_at.is_(None))
+    for row in db.execute(select(Intervention.status, func.count()).filter(*live).group_by(Intervention.status)):
+        counters[("status", row[0].value)] += row[1]
+    for row in db.execute(
+        select(Intervention.technician_id, func.count())
+        .filter(*live, Intervention.status.in_(open_statuses))
+        .group_by(Intervention.technician_id)
+    ):
+        counters[("open", str(row[0]))] += row[1]
+    # Les évènements archivés (events_archive) restent comptés
+    for source in (Event, ArchivedEvent):
+        for row in db.execute(select(source.type, func.count()).filter(source.organisation_id == org_id).group_by(source.type)):
+            counters[("events", row[0].value)] += row[1]
+
+    lead_times = {
+        row.id: lead_seconds(row.created_at, row.completed_at)
+        for row in db.execute(
+            select(Intervention.id, Intervention.created_at, Intervention.completed_at)
+            .filter(*live, Intervention.status == InterventionStatus.COMPLETED, Intervention.completed_at.is_not(None))
+        )
+    }
+    counters.update(lead_deltas(list(lead_times.values())))
+    return counters, lead_times
+
+def stored_stats(db: Session, org_id: int) -> tuple[Counter, dict[int, int]]:
+    counters = Counter({
+        (row.metric, row.dimension): row.value
+        for row in db.execute(select(OrgStat).filter(OrgStat.org_id == org_id)).scalars()
+        if row.value
+    })
+    lead_times = dict(db.execute(select(LeadTime.intervention_id, LeadTime.seconds).filter(LeadTime.org_id == org_id)).all())
+    return counters, lead_times
+
+def rebuild_org(db: Session, org_id: int) -> None:
+    """Remplace les statistiques de l'org par un recalcul complet (sans commit)."""
+    counters, lead_times = compute_stats(db, org_id)
+    db.execute(delete(OrgStat).where(OrgStat.org_id == org_id))
+    db.execute(delete(LeadTime).where(LeadTime.org_id == org_id))
+    bump(db, org_id, counters)
+    if lead_times:
+        db.execute(insert(LeadTime), [
+            {"intervention_id": intervention_id, "org_id": org_id, "seconds": seconds}
+            for intervention_id, seconds in lead_times.items()
+        ])
@@ -0,0 +1,38 @@
+# Types de colonnes partagés par les modèles.
+
+import base64
+import json
+import zlib
+from sqlalchemy import JSON
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+compressed_key = "__zlib__"
+
+class CompactJSON(TypeDecorator):
+    """Colonne JSON dont les gros documents sont stockés compressés.
+    Au-delà de EVENT_PAYLOAD_COMPRESS_MIN_BYTES (JSON compact), la valeur écrite est une
+    enveloppe {"__zlib__": base64(zlib(json))} ; en dessous, le JSON est stocké tel quel.
+    Décodage transparent à la lecture : les anciennes lignes (non compressées) restent lisibles
+    et la colonne reste de type JSON en base, sans migration.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        # Une valeur qui ressemble déjà à une enveloppe est toujours compressée pour rester décodable
+        if len(encoded) < settings.EVENT_PAYLOAD_COMPRESS_MIN_BYTES and not _is_envelope(value):
+            return value
+        return {compressed_key: base64.b64encode(zlib.compress(encoded)).decode("ascii")}
+
+    def process_result_value(self, value, dialect):
+        if _is_envelope(value):
+            return json.loads(zlib.decompress(base64.b64decode(value[compressed_key])))
+        return value
+
+def _is_envelope(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and compressed_key in value
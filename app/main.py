@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.security import SecurityHeadersMiddleware
-from app.api.routers import health, clients, technicians, interventions, events, auth
+from app.api.routers import health, clients, technicians, interventions, events, timeline, stats, auth, aio
 
 app = FastAPI(title=settings.APP_NAME)
 
@@ -20,7 +20,14 @@ app.add_middleware(
 # Routers
 app.include_router(auth.router)
 app.include_router(health.router)
-app.include_router(clients.router)
-app.include_router(technicians.router)
-app.include_router(interventions.router)
-app.include_router(events.router)
\ No newline at end of file
+if settings.ASYNC_DB:
+    # Mêmes routes, servies via AsyncSession (aiosqlite / psycopg async)
+    for router in aio.routers:
+        app.include_router(router)
+else:
+    app.include_router(clients.router)
+    app.include_router(technicians.router)
+    app.include_router(interventions.router)
+    app.include_router(events.router)
+    app.include_router(timeline.router)
+    app.include_router(stats.router)
\ No newline at end of file
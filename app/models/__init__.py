@@ -1,2 +1,5 @@
 # Importez vos modèles ici pour que Alembic les détecte lors de l'autogénération :
-from app.models import client, technician, intervention, event, organisation
\ No newline at end of file
+from app.models import client, technician, intervention, event, organisation, principal, stats
+
+# Index plein texte (FTS5 / tsvector) posés à la création des tables clients et technicians
+from app.db import search
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from datetime import datetime, timezone
@@ -15,8 +15,18 @@ class Client(Base):
     phone = Column(String, unique=True)
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.now(timezone.utc))
+    # Version de la ligne, sert d'ETag pour GET /clients/{id}
+    updated_at = Column(DateTime, nullable=True, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
 
     organisation = relationship("Organisation", back_populates="clients")
     interventions = relationship("Intervention", back_populates="client", cascade="all, delete-orphan")
+
+    # Index fonctionnels : les recherches insensibles à la casse filtrent sur lower(col)
+    __table_args__ = (
+        Index("ix_clients_username_lower", func.lower(username)),
+        Index("ix_clients_email_lower", func.lower(email)),
+        # Index partiel des clients vivants : GET /clients (include_deleted=false) ignore les tombstones
+        Index("ix_clients_org_live", "org_id", "id", sqlite_where=deleted_at.is_(None), postgresql_where=deleted_at.is_(None)),
+    )
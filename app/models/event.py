@@ -3,11 +3,13 @@
 # - Type d'évènement (enum libre), note/payload JSON, horodatage.
 # - Index (intervention_id, created_at).
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index, select, update
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
 from app.db.base import Base
+from app.db.types import CompactJSON
+from app.models.intervention import Intervention
 
 class EventType(str, enum.Enum):
     STARTED = "started"
@@ -15,14 +17,34 @@ class EventType(str, enum.Enum):
     COMPLETED = "completed"
     DELETED = "deleted"
 
+def next_event_seq(context) -> int:
+    """Numéro de séquence suivant pour l'intervention de l'évènement inséré.
+    Le compteur Intervention.last_event_seq est incrémenté dans la même transaction :
+    l'UPDATE verrouille la ligne (Postgres), donc la séquence reste monotone sans trou
+    même avec des écritures concurrentes.
+    """
+    intervention_id = context.get_current_parameters()["intervention_id"]
+    interventions = Intervention.__table__
+    context.connection.execute(
+        update(interventions)
+        .where(interventions.c.id == intervention_id)
+        # updated_at inchangé : un nouvel évènement ne modifie pas l'intervention elle-même
+        .values(last_event_seq=interventions.c.last_event_seq + 1, updated_at=interventions.c.updated_at)
+    )
+    return context.connection.execute(
+        select(interventions.c.last_event_seq).where(interventions.c.id == intervention_id)
+    ).scalar_one()
+
 class Event(Base):
     __tablename__ = "events"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     type = Column(Enum(EventType), nullable=False)
     note = Column(String, nullable=True)
-    payload = Column(JSON, nullable=True)
+    # JSON compressé au-delà de EVENT_PAYLOAD_COMPRESS_MIN_BYTES (voir app.db.types)
+    payload = Column(CompactJSON, nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    seq = Column(Integer, default=next_event_seq, nullable=False)
 
     intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False)
     organisation_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
@@ -34,5 +56,33 @@ class Event(Base):
 
     __table_args__ = (
         Index("ix_event_intervention_created", "intervention_id", "created_at"),
+        Index("ix_event_intervention_seq", "intervention_id", "seq", unique=True),
+        # Export de la timeline de l'org : parcours keyset sur (created_at, id)
+        Index("ix_event_org_created_id", "organisation_id", "created_at", "id"),
     )
 
+
+class ArchivedEvent(Base):
+    """Archive froide des timelines d'interventions clôturées (voir app.db.archive).
+    Mêmes colonnes qu'Event (id et seq conservés), en ajout seul : rien ne la modifie après
+    l'archivage. Index (intervention_id, seq) pour relire une timeline, (organisation_id,
+    created_at, id) pour l'export de l'org.
+    """
+    __tablename__ = "events_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    type = Column(Enum(EventType), nullable=False)
+    note = Column(String, nullable=True)
+    payload = Column(CompactJSON, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    seq = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False)
+    organisation_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
+    technician_id = Column(Integer, ForeignKey("technicians.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_event_archive_intervention_seq", "intervention_id", "seq", unique=True),
+        Index("ix_event_archive_org_created_id", "organisation_id", "created_at", "id"),
+    )
@@ -20,9 +20,14 @@ class Intervention(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     status = Column(Enum(InterventionStatus), nullable=False, default=InterventionStatus.PENDING)
     description = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Callables : évalués à chaque écriture (sert aussi d'ETag pour GET /items/{id})
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     deleted_at = Column(DateTime, nullable=True)
+    # Dernier passage au statut completed (durée de traitement, voir app.models.stats)
+    completed_at = Column(DateTime, nullable=True)
+    # Dernier Event.seq attribué pour cette intervention (voir app.models.event.next_event_seq)
+    last_event_seq = Column(Integer, nullable=False, default=0, server_default="0")
 
     client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
     org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
@@ -35,4 +40,8 @@ class Intervention(Base):
 
     __table_args__ = (
         Index("ix_intervention_client_created", "client_id", "created_at"),
+        Index("ix_intervention_org_created_id", "org_id", "created_at", "id"),
+        # Même chemin limité aux interventions vivantes (GET /items et export, include_deleted=false)
+        Index("ix_intervention_org_created_id_live", "org_id", "created_at", "id",
+              sqlite_where=deleted_at.is_(None), postgresql_where=deleted_at.is_(None)),
     )
\ No newline at end of file
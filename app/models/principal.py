@@ -0,0 +1,64 @@
+# Annuaire unifié des utilisateurs (clients + techniciens).
+# - Une ligne par compte : username en minuscules -> (role, id, org_id, hash, deleted_at).
+# - Login et résolution du token = une seule lecture indexée, quel que soit le rôle.
+# - Maintenu par les évènements ORM de Client/Technician (insert, update, delete).
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, event, insert, update, delete, inspect
+from app.db.base import Base
+from app.models.client import Client
+from app.models.technician import Technician
+
+class Principal(Base):
+    __tablename__ = "principals"
+
+    role = Column(String, primary_key=True)
+    principal_id = Column(Integer, primary_key=True, autoincrement=False)
+    username = Column(String, nullable=False)
+    username_lower = Column(String, nullable=False)
+    hashed_password = Column(String, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)
+
+    org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_principal_username_role", "username_lower", "role"),
+    )
+
+def principal_values(role: str, user) -> dict:
+    """Colonnes de l'annuaire pour un Client/Technician (objet ORM ou ligne)."""
+    return {
+        "role": role,
+        "principal_id": user.id,
+        "username": user.username,
+        "username_lower": user.username.lower(),
+        "hashed_password": user.hashed_password,
+        "deleted_at": user.deleted_at,
+        "org_id": user.org_id,
+    }
+
+_tracked_attributes = ("username", "hashed_password", "deleted_at", "org_id")
+
+def _register(model, role: str) -> None:
+    table = Principal.__table__
+
+    @event.listens_for(model, "after_insert")
+    def _after_insert(mapper, connection, target):
+        connection.execute(insert(table).values(**principal_values(role, target)))
+
+    @event.listens_for(model, "after_update")
+    def _after_update(mapper, connection, target):
+        state = inspect(target)
+        if not any(state.attrs[name].history.has_changes() for name in _tracked_attributes):
+            return
+        connection.execute(
+            update(table)
+            .where(table.c.role == role, table.c.principal_id == target.id)
+            .values(**principal_values(role, target))
+        )
+
+    @event.listens_for(model, "after_delete")
+    def _after_delete(mapper, connection, target):
+        connection.execute(delete(table).where(table.c.role == role, table.c.principal_id == target.id))
+
+_register(Client, "client")
+_register(Technician, "tech")
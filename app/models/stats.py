@@ -0,0 +1,51 @@
+# Statistiques par organisation maintenues de façon incrémentale (GET /stats).
+# - org_stats : compteurs (org_id, metric, dimension) -> value, mis à jour par upsert dans la
+#   transaction de chaque écriture (items, PATCH /items/bulk, évènements). Voir app.db.stats.
+# - lead_times : une ligne par intervention terminée (completed, non supprimée), durée
+#   création -> completed en secondes ; garde la durée comptée dans les buckets ("lead_bucket"
+#   de org_stats, qui servent la médiane) pour la décompter à l'annulation ou la suppression.
+# - status_segments : temps passé par chaque intervention dans chaque statut (un segment ouvert
+#   par intervention, fermé au changement de statut ou à la suppression) -> GET /items/analytics.
+# Recalcul complet et vérification : scripts/rebuild_stats.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
+from app.db.base import Base
+from app.models.intervention import InterventionStatus
+
+class OrgStat(Base):
+    __tablename__ = "org_stats"
+
+    org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class LeadTime(Base):
+    __tablename__ = "lead_times"
+
+    intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
+    seconds = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_lead_time_org_seconds", "org_id", "seconds"),
+    )
+
+class StatusSegment(Base):
+    __tablename__ = "status_segments"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(Enum(InterventionStatus), nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    # NULL tant que l'intervention est dans ce statut
+    ended_at = Column(DateTime, nullable=True)
+    seconds = Column(Integer, nullable=True)
+
+    intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False)
+    org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
+    technician_id = Column(Integer, ForeignKey("technicians.id", ondelete="RESTRICT"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_status_segment_intervention", "intervention_id", "ended_at"),
+        Index("ix_status_segment_org_ended", "org_id", "ended_at"),
+    )
@@ -2,7 +2,7 @@
 # - Rattaché à une organisation (org_id).
 # - Unicité éventuelle (email/org).
 
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
@@ -18,6 +18,8 @@ class Technician(Base):
     hashed_password = Column(String, nullable=False)
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.now(timezone.utc)) 
+    # Version de la ligne, sert d'ETag pour GET /technicians/{id}
+    updated_at = Column(DateTime, nullable=True, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     org_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
 
@@ -26,4 +28,9 @@ class Technician(Base):
 
     __table_args__ = (
         UniqueConstraint("email", "org_id", name="uq_technician_email_org"),
+        # Index fonctionnels : les recherches insensibles à la casse filtrent sur lower(col)
+        Index("ix_technicians_username_lower", func.lower(username)),
+        Index("ix_technicians_email_lower", func.lower(email)),
+        # Index partiel des techniciens vivants : GET /technicians (include_deleted=false) ignore les tombstones
+        Index("ix_technicians_org_live", "org_id", "id", sqlite_where=deleted_at.is_(None), postgresql_where=deleted_at.is_(None)),
     )
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+class BulkRowResult(BaseModel):
+    index: int
+    status: Literal["created", "rejected"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    created: int
+    rejected: int
+    results: List[BulkRowResult]
@@ -2,12 +2,14 @@ from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime
 
+from app.schemas.types import StoredEmail
+
 class ClientOut(BaseModel):
     id: int
     first_name: str
     last_name: str
     username: str
-    email: EmailStr
+    email: StoredEmail
     phone: Optional[str]
     organisation: str
     created_at: datetime
@@ -20,7 +22,8 @@ class ClientOut(BaseModel):
         }
 
 class PaginatedClient(BaseModel):
-    total_result: int
+    total_result: Optional[int] = None
+    has_more: bool = False
     limit: int
     offset: int
     clients: List[ClientOut]
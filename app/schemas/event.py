@@ -17,6 +17,7 @@ class CreateEvent(BaseModel):
 
 class EventOut(BaseModel):
     id: int
+    seq: int
     type: str
     note: Optional[str] = None
     payload: Optional[dict[str, Any]] = None
@@ -31,3 +32,8 @@ class EventOut(BaseModel):
             'from_attributes': True,
             'extra': 'ignore'
         }
+
+class EventExport(EventOut):
+    intervention_status: str
+    technician_username: Optional[str] = None
+    cursor: str
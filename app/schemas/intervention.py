@@ -33,11 +33,41 @@ class ItemOut(BaseModel):
         }
 
 class PaginatedItem(BaseModel):
-    total_result: int
+    total_result: Optional[int] = None
+    has_more: bool = False
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
     interventions: List[ItemOut]
 
 class PatchItem(BaseModel):
     status: Optional[InterventionStatus] = None
     description: Optional[str] = None
+
+class BulkPatchItem(BaseModel):
+    ids: List[int]
+    status: InterventionStatus
+
+class BulkItemRejection(BaseModel):
+    id: int
+    status_code: int
+    detail: str
+
+class BulkPatchResult(BaseModel):
+    applied: List[int]
+    rejected: List[BulkItemRejection]
+
+class StatusDuration(BaseModel):
+    technician_id: int
+    technician_username: str
+    status: str
+    count: int
+    total_seconds: int
+    p50_seconds: float
+    p90_seconds: float
+    p95_seconds: float
+
+class ItemAnalytics(BaseModel):
+    start: datetime
+    end: datetime
+    durations: List[StatusDuration]
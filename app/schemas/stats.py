@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class TechnicianLoad(BaseModel):
+    technician_id: int
+    username: str
+    open: int
+
+class OrgStatsOut(BaseModel):
+    by_status: dict[str, int]
+    open_by_technician: List[TechnicianLoad]
+    events_by_type: dict[str, int]
+    median_lead_time_seconds: Optional[float] = None
@@ -2,10 +2,12 @@ from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime
 
+from app.schemas.types import StoredEmail
+
 class TechOut(BaseModel):
     id: int
     name: str
-    email: EmailStr
+    email: StoredEmail
     username: str
     organisation: str
     created_at: datetime
@@ -18,7 +20,8 @@ class TechOut(BaseModel):
         }
 
 class PaginatedTech(BaseModel):
-    total_result: int
+    total_result: Optional[int] = None
+    has_more: bool = False
     limit: int
     offset: int
     techniciens: List[TechOut]
@@ -0,0 +1,6 @@
+from pydantic import WithJsonSchema
+from typing import Annotated
+
+# Email relu depuis la base : déjà validé à l'écriture (EmailStr dans Create*/Patch*).
+# Le revalider en sortie coûte ~130 µs par ligne (email_validator) ; même schéma OpenAPI.
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
@@ -0,0 +1,48 @@
+"""
+Archivage des timelines d'interventions clôturées (events -> events_archive, voir app.db.archive):
+- Évènements des interventions terminées / annulées ou supprimées depuis plus de --days jours.
+- Lots de --batch-size évènements, une transaction par lot (verrous et journal bornés).
+- Interruptible : chaque lot commité est définitivement archivé, relancer reprend la suite.
+
+Usage: python -m scripts.archive_events [--days 90] [--batch-size 1000] [--org ID]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.archive import archive_batch
+import app.models
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=settings.EVENT_ARCHIVE_AFTER_DAYS, help="Ancienneté de clôture minimale")
+    parser.add_argument("--batch-size", type=int, default=settings.EVENT_ARCHIVE_BATCH_SIZE, help="Évènements par transaction")
+    parser.add_argument("--org", type=int, help="Org à traiter (défaut : toutes)")
+    args = parser.parse_args()
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=args.days)).replace(tzinfo=None)
+    db = SessionLocal()
+    moved = 0
+    after_id = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ids = archive_batch(db, cutoff, args.batch_size, after_id, args.org)
+            if not ids:
+                break
+            db.commit()
+            moved += len(ids)
+            after_id = ids[-1]
+            print(f"[archive-events] {moved} évènements archivés (id <= {after_id})")
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    print(f"[archive-events] terminé : {moved} évènements clôturés avant {cutoff:%Y-%m-%d} en {elapsed:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark sync vs async:
+- Sert les mêmes routes (GET /items, GET /clients/{id}) via les routers sync (threadpool)
+  puis via les routers async (AsyncSession), à 50 / 200 / 1000 connexions concurrentes.
+- Base SQLite temporaire (aiosqlite côté async) sauf si DATABASE_URL est défini.
+- Pool dimensionné au-dessus du threadpool (40) : sinon les routes sync se bloquent
+  mutuellement (threads en attente de connexion, connexions en attente d'un thread pour close).
+- Au-delà de pool + threadpool requêtes en vol (c=1000), la pile sync s'effondre quand même :
+  la validation de la réponse d'une route sync repasse par le threadpool alors que la session
+  tient encore sa connexion, et seuls les pool_timeout (30 s) débloquent la file. Prévoir
+  ~20 min pour `--concurrency 1000 --stacks sync` ; la pile async n'est pas concernée.
+
+Usage: python -m scripts.bench_async [--requests 2000] [--concurrency 50 200 1000] [--stacks sync async]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("APP_NAME", "GarageOS bench")
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+os.environ.setdefault("DB_POOL_SIZE", "20")
+os.environ.setdefault("DB_MAX_OVERFLOW", "40")
+
+import httpx
+from fastapi import FastAPI
+
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.core.security import create_access_token
+from app.api.routers import clients, technicians, interventions, events, aio
+from app.models.organisation import Organisation
+from app.models.client import Client
+from app.models.technician import Technician
+from app.models.intervention import Intervention
+
+def build_app(routers) -> FastAPI:
+    app = FastAPI(title="bench")
+    for router in routers:
+        app.include_router(router)
+    return app
+
+def seed(rows: int) -> tuple[str, int]:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        org = Organisation(name="Bench", street="1 rue", postal_code="75000")
+        db.add(org)
+        db.commit()
+        tech = Technician(username="benchtech", email="tech@example.com", name="Bench", org_id=org.id, hashed_password="x")
+        db.add(tech)
+        db.commit()
+        client_ids = []
+        for i in range(rows):
+            client = Client(first_name="C", last_name=str(i), username=f"client{i}", email=f"c{i}@example.com",
+                            phone=f"06{i:08d}", org_id=org.id, hashed_password="x")
+            db.add(client)
+            db.flush()
+            client_ids.append(client.id)
+            db.add(Intervention(client_id=client.id, org_id=org.id, technician_id=tech.id, description=f"desc {i}"))
+        db.commit()
+        token = create_access_token({"sub": tech.username, "org_id": org.id, "role": "tech"})
+        return token, client_ids[0]
+    finally:
+        db.close()
+
+async def run(app: FastAPI, token: str, client_id: int, total: int, concurrency: int) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/items?limit=20", f"/clients/{client_id}"]
+    latencies: list[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await http.get(paths[i % len(paths)], headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if resp.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--stacks", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = parser.parse_args()
+
+    token, client_id = seed(args.rows)
+    apps = {
+        "sync": build_app([clients.router, technicians.router, interventions.router, events.router]),
+        "async": build_app(aio.routers),
+    }
+    for concurrency in args.concurrency:
+        for label in args.stacks:
+            app = apps[label]
+            result = asyncio.run(run(app, token, client_id, args.requests, concurrency))
+            print(
+                f"[bench-async] {label:<5} c={concurrency:<5} {result['rps']:8.1f} req/s | "
+                f"p50 {result['p50']:7.1f} ms | p95 {result['p95']:7.1f} ms | erreurs {result['errors']}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark import en masse:
+- Importe N clients via POST /clients (une requête par ligne) puis via POST /clients/bulk,
+  sur une base SQLite temporaire, et affiche la durée et le débit de chaque méthode.
+- --rounds fixe le coût bcrypt (12 = défaut passlib) : le hachage domine la durée totale,
+  son débit est borné par PASSWORD_HASH_WORKERS.
+
+Usage: python -m scripts.bench_bulk [--rows 10000] [--single-rows 200] [--rounds 12]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_bulk.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("APP_NAME", "GarageOS bench")
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.core import security
+from app.models.organisation import Organisation
+from app.schemas.client import CreateClient
+from app.api.routers.clients import create_client, create_clients_bulk
+
+class BenchUser:
+    org_id = None
+
+def batch(prefix: str, rows: int) -> list[CreateClient]:
+    return [
+        CreateClient(first_name="Bench", last_name=str(i), username=f"{prefix}{i}", password="password",
+                     email=f"{prefix}{i}@example.com", phone=f"{prefix}-{i}")
+        for i in range(rows)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    security.pwd_context.update(bcrypt__rounds=args.rounds)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        org = Organisation(name="Bench", street="1 rue", postal_code="75000")
+        db.add(org)
+        db.commit()
+        BenchUser.org_id = org.id
+
+        start = time.perf_counter()
+        for new_user in batch("single", args.single_rows):
+            create_client(new_user, current_user=BenchUser(), current_role=None, db=db)
+        elapsed = time.perf_counter() - start
+        print(f"[bench-bulk] POST /clients      {args.single_rows:>6} lignes en {elapsed:7.2f} s ({args.single_rows / elapsed:8.1f} lignes/s)")
+
+        start = time.perf_counter()
+        result = create_clients_bulk(batch("bulk", args.rows), current_user=BenchUser(), current_role=None, db=db)
+        elapsed = time.perf_counter() - start
+        print(f"[bench-bulk] POST /clients/bulk {result.created:>6} lignes en {elapsed:7.2f} s ({result.created / elapsed:8.1f} lignes/s)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
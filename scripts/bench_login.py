@@ -0,0 +1,118 @@
+"""
+Benchmark login storm:
+- Lance N connexions concurrentes sur /auth/login tout en mesurant la latence de GET /health.
+- Compare avec une variante "bloquante" (bcrypt exécuté directement sur l'event loop,
+  comportement historique de /auth/login) pour montrer l'effet sur les autres routes.
+
+Usage: python -m scripts.bench_login [--logins 100] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("APP_NAME", "GarageOS bench")
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+
+import httpx
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine, SessionLocal, get_db
+from app.core.security import pwd_context, hash_password, create_access_token
+from app.api.routers.auth import _find_user
+from app.models.organisation import Organisation
+from app.models.client import Client
+
+PASSWORD = "bench-password"
+
+@app.post("/bench/blocking-login", include_in_schema=False)
+async def blocking_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    """Reproduction de l'ancien /auth/login : requêtes et bcrypt sur l'event loop."""
+    user, role = _find_user(db, form_data.username)
+    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Identifiants invalides.")
+    return {"access_token": create_access_token({"sub": user.username, "org_id": user.org_id, "role": role})}
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        org = Organisation(name="Bench", street="1 rue", postal_code="75000")
+        db.add(org)
+        db.commit()
+        db.add(Client(first_name="B", last_name="B", username="bench", email="bench@example.com",
+                      phone="0000", org_id=org.id, hashed_password=hash_password(PASSWORD)))
+        db.commit()
+    finally:
+        db.close()
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+async def storm(path: str, logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop, idle))
+        await asyncio.sleep(0.5)
+        stop.set()
+        await prober
+
+        busy: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop, busy))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with semaphore:
+                resp = await client.post(path, data={"username": "bench", "password": PASSWORD})
+                return resp.status_code
+
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "ok": sum(1 for code in codes if code == 200),
+        "health_idle_p50_ms": statistics.median(idle),
+        "health_storm_p50_ms": statistics.median(busy) if busy else float("nan"),
+        "health_storm_max_ms": max(busy) if busy else float("nan"),
+        "health_samples": len(busy),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    seed()
+    for label, path in [("bloquant (ancien)", "/bench/blocking-login"), ("executor bcrypt", "/auth/login")]:
+        result = asyncio.run(storm(path, args.logins, args.concurrency))
+        print(
+            f"[bench-login] {label:<18} {result['logins_per_s']:7.1f} logins/s ({result['ok']} ok) | "
+            f"/health p50 idle {result['health_idle_p50_ms']:.1f} ms, pendant storm p50 "
+            f"{result['health_storm_p50_ms']:.1f} ms / max {result['health_storm_max_ms']:.1f} ms "
+            f"({result['health_samples']} mesures)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Microbenchmark SecurityHeadersMiddleware:
+- Appelle directement l'application ASGI (sans réseau ni client HTTP) N fois et mesure
+  le coût par requête : sans middleware, ancienne version BaseHTTPMiddleware, version ASGI pure.
+
+Usage: python -m scripts.bench_security_headers [--requests 20000]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.security import SecurityHeadersMiddleware, security_headers
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Ancienne implémentation (BaseHTTPMiddleware), conservée pour comparaison."""
+    async def dispatch(self, request, call_next):
+        resp = await call_next(request)
+        for name, value in security_headers().items():
+            if value:
+                resp.headers[name] = value
+        return resp
+
+async def ping(request):
+    return PlainTextResponse("ok")
+
+def build(middleware: list[Middleware]) -> Starlette:
+    return Starlette(routes=[Route("/ping", ping)], middleware=middleware)
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+    "scheme": "http", "path": "/ping", "raw_path": b"/ping", "query_string": b"",
+    "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+}
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(SCOPE), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = {
+        "sans middleware": build([]),
+        "BaseHTTPMiddleware": build([Middleware(LegacySecurityHeadersMiddleware)]),
+        "ASGI pur": build([Middleware(SecurityHeadersMiddleware)]),
+    }
+    baseline = None
+    for label, app in variants.items():
+        per_request = asyncio.run(drive(app, args.requests))
+        baseline = per_request if baseline is None else baseline
+        print(f"[bench-headers] {label:<20} {per_request:7.1f} µs/requête (surcoût {per_request - baseline:+6.1f} µs)")
+
+if __name__ == "__main__":
+    main()
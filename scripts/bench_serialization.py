@@ -0,0 +1,153 @@
+"""
+Benchmark sérialisation des listes (GET /items, /clients, /technicians):
+- Ancienne version : entités ORM + un ItemOut/ClientOut/TechOut construit par ligne.
+- Version actuelle : colonnes projetées, une seule validation de la page (row_dicts + model_validate).
+- Dans les deux cas on ajoute ce que fait FastAPI derrière le handler (validation du
+  response_model puis dump_json), et on mesure le CPU par page (time.process_time).
+
+Usage: python -m scripts.bench_serialization [--rows 2000] [--pages 200] [--limit 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_serialization.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("APP_NAME", "GarageOS bench")
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert
+
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.api.deps import response_cache
+from app.api.routers import clients, technicians, interventions
+from app.core.pagination import fetch_page
+from app.models.organisation import Organisation
+from app.models.client import Client
+from app.models.technician import Technician
+from app.models.intervention import Intervention
+from app.schemas.client import PaginatedClient, ClientOut
+from app.schemas.tech import PaginatedTech, TechOut
+from app.schemas.intervention import PaginatedItem, ItemOut
+
+def seed(rows: int) -> SimpleNamespace:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        org = Organisation(name="Bench", street="1 rue", postal_code="75000")
+        db.add(org)
+        db.commit()
+        db.execute(insert(Technician), [
+            {"username": f"tech{i}", "email": f"t{i}@example.com", "name": f"Tech {i}", "org_id": org.id, "hashed_password": "x"}
+            for i in range(rows)
+        ])
+        db.execute(insert(Client), [
+            {"first_name": "C", "last_name": str(i), "username": f"client{i}", "email": f"c{i}@example.com",
+             "phone": f"06{i:08d}", "org_id": org.id, "hashed_password": "x"}
+            for i in range(rows)
+        ])
+        tech_ids = db.execute(select(Technician.id)).scalars().all()
+        client_ids = db.execute(select(Client.id)).scalars().all()
+        db.execute(insert(Intervention), [
+            {"client_id": client_id, "technician_id": tech_id, "org_id": org.id, "description": f"desc {client_id}"}
+            for client_id, tech_id in zip(client_ids, tech_ids)
+        ])
+        db.commit()
+        return SimpleNamespace(org_id=org.id)
+    finally:
+        db.close()
+
+# --- Anciennes versions des handlers (entités ORM, un modèle par ligne), conservées pour comparaison ---
+
+def legacy_items(db, user, limit):
+    query = (
+        select(Intervention, Organisation.name.label("org_name"), Client.username.label("client_username"), Technician.username.label("technician_username"))
+        .join(Organisation, Intervention.org_id == Organisation.id)
+        .join(Client, Intervention.client_id == Client.id)
+        .join(Technician, Intervention.technician_id == Technician.id)
+        .filter(Intervention.org_id == user.org_id)
+    )
+    page = fetch_page(db, query, limit, 0)
+    items = [
+        ItemOut(
+            id=row.Intervention.id, status=row.Intervention.status, description=row.Intervention.description,
+            client_username=row.client_username, technicien_username=row.technician_username, organisation=row.org_name,
+            created_at=row.Intervention.created_at, updated_at=row.Intervention.updated_at, deleted_at=row.Intervention.deleted_at
+        ) for row in page.rows
+    ]
+    return PaginatedItem(total_result=page.total, has_more=page.has_more, limit=limit, offset=0, interventions=items)
+
+def legacy_clients(db, user, limit):
+    query = select(Client, Organisation.name.label("org_name")).join(Organisation, Client.org_id == Organisation.id).filter(Client.org_id == user.org_id)
+    page = fetch_page(db, query, limit, 0)
+    items = [
+        ClientOut(id=row.Client.id, first_name=row.Client.first_name, last_name=row.Client.last_name, username=row.Client.username,
+                  email=row.Client.email, phone=row.Client.phone, organisation=row.org_name, created_at=row.Client.created_at, deleted_at=row.Client.deleted_at)
+        for row in page.rows
+    ]
+    return PaginatedClient(total_result=page.total, has_more=page.has_more, limit=limit, offset=0, clients=items)
+
+def legacy_technicians(db, user, limit):
+    query = select(Technician, Organisation.name.label("org_name")).join(Organisation, Technician.org_id == Organisation.id).filter(Technician.org_id == user.org_id)
+    page = fetch_page(db, query, limit, 0)
+    items = [
+        TechOut(id=row.Technician.id, name=row.Technician.name, email=row.Technician.email, username=row.Technician.username,
+                organisation=row.org_name, created_at=row.Technician.created_at, deleted_at=row.Technician.deleted_at)
+        for row in page.rows
+    ]
+    return PaginatedTech(total_result=page.total, has_more=page.has_more, limit=limit, offset=0, techniciens=items)
+
+def measure(handler, adapter: TypeAdapter, pages: int) -> float:
+    """CPU moyen (ms) par page : handler + validation du response_model + dump_json, comme FastAPI."""
+    for _ in range(10):
+        adapter.dump_json(adapter.validate_python(handler()))
+    start = time.process_time()
+    for _ in range(pages):
+        response_cache.clear()
+        adapter.dump_json(adapter.validate_python(handler()))
+    return (time.process_time() - start) / pages * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    user = seed(args.rows)
+    limit = args.limit
+    db = SessionLocal()
+    try:
+        endpoints = {
+            "GET /items": (
+                PaginatedItem,
+                lambda: legacy_items(db, user, limit),
+                lambda: interventions.list_items(limit=limit, offset=0, count="exact", pagination="offset", cursor=None, status_eq=None, client_id=None, q=None, current_role=None, current_user=user, db=db),
+            ),
+            "GET /clients": (
+                PaginatedClient,
+                lambda: legacy_clients(db, user, limit),
+                lambda: clients.list_clients(q=None, limit=limit, offset=0, count="exact", current_user=user, current_role=None, db=db),
+            ),
+            "GET /technicians": (
+                PaginatedTech,
+                lambda: legacy_technicians(db, user, limit),
+                lambda: technicians.list_technicians(q=None, limit=limit, offset=0, count="exact", current_user=user, db=db),
+            ),
+        }
+        for label, (model, legacy, current) in endpoints.items():
+            adapter = TypeAdapter(model)
+            before = measure(legacy, adapter, args.pages)
+            after = measure(current, adapter, args.pages)
+            print(f"[bench-serialization] {label:<17} limit={limit} avant {before:6.2f} ms/page | après {after:6.2f} ms/page | x{before / after:.1f}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
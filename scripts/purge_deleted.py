@@ -0,0 +1,69 @@
+"""
+Purge définitive des clients / techniciens / interventions supprimés (soft delete), voir app.db.purge:
+- Lignes supprimées depuis plus de --days jours, étapes dans l'ordre des dépendances
+  (évènements, évènements archivés, interventions, clients, techniciens).
+- Lots de --batch-size lignes en ordre d'id (keyset), une transaction par lot, pause de
+  --throttle secondes entre deux lots pour laisser passer le trafic.
+- Affiche le débit (lignes/s) par lot et par étape. Interruptible : chaque lot commité est
+  définitif, relancer reprend ce qui reste (--after-id pour repartir d'un id donné).
+
+Usage: python -m scripts.purge_deleted [--days 365] [--batch-size 500] [--throttle 0.1] [--org ID]
+                                       [--step events|events_archive|interventions|clients|technicians] [--after-id ID]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.purge import purge_steps
+import app.models
+
+def run_step(db, name: str, purge_batch, cutoff: datetime, args, after_id: int) -> int:
+    purged = 0
+    start = time.perf_counter()
+    while True:
+        batch_start = time.perf_counter()
+        ids = purge_batch(db, cutoff, args.batch_size, after_id, args.org)
+        if not ids:
+            db.rollback()
+            break
+        db.commit()
+        purged += len(ids)
+        after_id = ids[-1]
+        rate = len(ids) / max(time.perf_counter() - batch_start, 1e-6)
+        print(f"[purge-deleted] {name}: {purged} lignes (id <= {after_id}, {rate:.0f} lignes/s)")
+        time.sleep(args.throttle)
+    elapsed = time.perf_counter() - start
+    print(f"[purge-deleted] {name}: terminé, {purged} lignes en {elapsed:.1f} s ({purged / max(elapsed, 1e-6):.0f} lignes/s)")
+    return purged
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=settings.PURGE_AFTER_DAYS, help="Délai de rétention après suppression")
+    parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE, help="Lignes par transaction")
+    parser.add_argument("--throttle", type=float, default=settings.PURGE_THROTTLE_SECONDS, help="Pause entre deux lots (s)")
+    parser.add_argument("--org", type=int, help="Org à traiter (défaut : toutes)")
+    parser.add_argument("--step", choices=list(purge_steps), help="Reprendre à cette étape (défaut : toutes)")
+    parser.add_argument("--after-id", type=int, default=0, help="Reprendre l'étape --step après cet id")
+    args = parser.parse_args()
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=args.days)).replace(tzinfo=None)
+    steps = list(purge_steps)
+    if args.step:
+        steps = steps[steps.index(args.step):]
+    db = SessionLocal()
+    total = 0
+    try:
+        for name in steps:
+            after_id = args.after_id if name == args.step else 0
+            total += run_step(db, name, purge_steps[name], cutoff, args, after_id)
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"[purge-deleted] {total} lignes purgées (supprimées avant {cutoff:%Y-%m-%d})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Recalcul des statistiques par org (org_stats / lead_times, voir app.db.stats):
+- Recompte depuis interventions / events et remplace les lignes de chaque org (une transaction par org).
+- --verify : compare sans écrire, affiche les écarts et sort en code 1 s'il y en a.
+
+Usage: python -m scripts.rebuild_stats [--org ID ...] [--verify]
+"""
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.db.stats import compute_stats, stored_stats, rebuild_org
+from app.models.organisation import Organisation
+import app.models
+
+def drift(expected: tuple, actual: tuple) -> list[str]:
+    counters, lead_times = expected
+    stored_counters, stored_lead_times = actual
+    lines = [
+        f"{metric}[{dimension}] attendu {counters.get((metric, dimension), 0)}, stocké {stored_counters.get((metric, dimension), 0)}"
+        for metric, dimension in sorted(set(counters) | set(stored_counters))
+        if counters.get((metric, dimension), 0) != stored_counters.get((metric, dimension), 0)
+    ]
+    for intervention_id in sorted(set(lead_times) | set(stored_lead_times)):
+        if lead_times.get(intervention_id) != stored_lead_times.get(intervention_id):
+            lines.append(f"lead_time[{intervention_id}] attendu {lead_times.get(intervention_id)}, stocké {stored_lead_times.get(intervention_id)}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--org", type=int, nargs="+", help="Orgs à traiter (défaut : toutes)")
+    parser.add_argument("--verify", action="store_true", help="Comparer sans écrire")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    drifted = 0
+    try:
+        org_ids = args.org or db.execute(select(Organisation.id).order_by(Organisation.id)).scalars().all()
+        for org_id in org_ids:
+            if args.verify:
+                lines = drift(compute_stats(db, org_id), stored_stats(db, org_id))
+                drifted += bool(lines)
+                status = "OK" if not lines else f"{len(lines)} écart(s)"
+                print(f"[rebuild-stats] org {org_id}: {status}")
+                for line in lines[:20]:
+                    print(f"  {line}")
+                db.rollback()
+            else:
+                rebuild_org(db, org_id)
+                db.commit()
+                print(f"[rebuild-stats] org {org_id}: recalculé")
+    finally:
+        db.close()
+    if drifted:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()